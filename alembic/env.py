@@ -12,6 +12,10 @@ from app.models.item import Item  # Import all models here
 from app.models.user import User  # Import User model
 from app.models.restaurant import Restaurant  # Import Restaurant model
 from app.models.data_collection import data_collection_api_calls  # Import data collection model
+from app.models.rate_limit import RateLimitBucket  # Import rate limiter state model
+from app.models.crawl_job import CrawlJob  # Import crawl job model
+from app.models.discovered_place import DiscoveredPlace  # Import discovered places model
+from app.models.facet_count import FacetCount  # Import facet counts model
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,29 @@
+"""add retry queue columns to data_collection_api_calls
+
+Revision ID: 0a7c3e9b5d14
+Revises: f6b1d8a3c920
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7c3e9b5d14'
+down_revision: Union[str, Sequence[str], None] = 'f6b1d8a3c920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('data_collection_api_calls', sa.Column('next_retry_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('data_collection_api_calls', sa.Column('error_class', sa.String(), nullable=True))
+    op.create_index('ix_data_collection_retry', 'data_collection_api_calls', ['status', 'next_retry_at'], unique=False)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_data_collection_retry', table_name='data_collection_api_calls')
+    op.drop_column('data_collection_api_calls', 'error_class')
+    op.drop_column('data_collection_api_calls', 'next_retry_at')
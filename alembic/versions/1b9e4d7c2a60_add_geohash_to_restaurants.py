@@ -0,0 +1,42 @@
+"""add geohash to restaurants
+
+Revision ID: 1b9e4d7c2a60
+Revises: 0a7c3e9b5d14
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.geo import point_geohash
+
+# revision identifiers, used by Alembic.
+revision: str = '1b9e4d7c2a60'
+down_revision: Union[str, Sequence[str], None] = '0a7c3e9b5d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('restaurants', sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    # Backfill restaurants saved so far
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(
+        "SELECT id, latitude, longitude FROM restaurants WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+    )).fetchall()
+    if rows:
+        connection.execute(
+            sa.text("UPDATE restaurants SET geohash = :geohash WHERE id = :id"),
+            [{"id": row.id, "geohash": point_geohash(row.latitude, row.longitude)} for row in rows]
+        )
+
+    op.create_index('ix_restaurants_geohash', 'restaurants', ['geohash'], unique=False,
+                    postgresql_ops={'geohash': 'varchar_pattern_ops'})
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_restaurants_geohash', table_name='restaurants')
+    op.drop_column('restaurants', 'geohash')
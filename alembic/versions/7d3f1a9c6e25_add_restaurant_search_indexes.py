@@ -0,0 +1,50 @@
+"""add full-text and typeahead search indexes to restaurants
+
+Revision ID: 7d3f1a9c6e25
+Revises: 1b9e4d7c2a60
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3f1a9c6e25'
+down_revision: Union[str, Sequence[str], None] = '1b9e4d7c2a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(cuisine_type, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(address, '')), 'D')"
+)
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('restaurants', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True
+    ))
+    op.create_index('ix_restaurants_search_vector', 'restaurants', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_restaurants_name_prefix', 'restaurants', [sa.text('lower(name) text_pattern_ops')], unique=False)
+
+    # Trigram typeahead needs pg_trgm; without it /restaurants/suggest falls back to prefix matches
+    connection = op.get_bind()
+    available = connection.execute(sa.text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )).scalar()
+    if available:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX ix_restaurants_name_trgm ON restaurants USING gin (name gin_trgm_ops)")
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_restaurants_name_trgm")
+    op.drop_index('ix_restaurants_name_prefix', table_name='restaurants')
+    op.drop_index('ix_restaurants_search_vector', table_name='restaurants')
+    op.drop_column('restaurants', 'search_vector')
@@ -0,0 +1,56 @@
+"""store scraped_json as jsonb and promote payload fields to columns
+
+Revision ID: 9e2b6c4f8a17
+Revises: 7d3f1a9c6e25
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2b6c4f8a17'
+down_revision: Union[str, Sequence[str], None] = '7d3f1a9c6e25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'restaurants', 'scraped_json',
+        type_=postgresql.JSONB(), postgresql_using='scraped_json::jsonb'
+    )
+    op.add_column('restaurants', sa.Column('user_ratings_total', sa.Integer(), nullable=True))
+    op.add_column('restaurants', sa.Column('business_status', sa.String(), nullable=True))
+    op.add_column('restaurants', sa.Column('types', postgresql.ARRAY(sa.String()), nullable=True))
+
+    # Backfill from the payloads saved so far
+    op.execute("""
+        UPDATE restaurants SET
+            user_ratings_total = CASE WHEN jsonb_typeof(scraped_json -> 'user_ratings_total') = 'number'
+                                      THEN (scraped_json ->> 'user_ratings_total')::numeric::integer END,
+            business_status = scraped_json ->> 'business_status',
+            types = CASE WHEN jsonb_typeof(scraped_json -> 'types') = 'array'
+                         THEN ARRAY(SELECT jsonb_array_elements_text(scraped_json -> 'types')) END
+        WHERE scraped_json IS NOT NULL AND jsonb_typeof(scraped_json) = 'object'
+    """)
+
+    op.create_index(op.f('ix_restaurants_user_ratings_total'), 'restaurants', ['user_ratings_total'], unique=False)
+    op.create_index(op.f('ix_restaurants_business_status'), 'restaurants', ['business_status'], unique=False)
+    op.create_index('ix_restaurants_types', 'restaurants', ['types'], unique=False, postgresql_using='gin')
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_restaurants_types', table_name='restaurants')
+    op.drop_index(op.f('ix_restaurants_business_status'), table_name='restaurants')
+    op.drop_index(op.f('ix_restaurants_user_ratings_total'), table_name='restaurants')
+    op.drop_column('restaurants', 'types')
+    op.drop_column('restaurants', 'business_status')
+    op.drop_column('restaurants', 'user_ratings_total')
+    op.alter_column(
+        'restaurants', 'scraped_json',
+        type_=sa.JSON(), postgresql_using='scraped_json::json'
+    )
@@ -0,0 +1,40 @@
+"""add quadtree columns to data_collection_api_calls
+
+Revision ID: a1f37b6d0c52
+Revises: 8c4e1f2a9d60
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1f37b6d0c52'
+down_revision: Union[str, Sequence[str], None] = '8c4e1f2a9d60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('data_collection_api_calls', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.add_column('data_collection_api_calls', sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('data_collection_api_calls', sa.Column('cell_size', sa.Float(), nullable=True))
+    op.add_column('data_collection_api_calls', sa.Column('radius', sa.Integer(), nullable=True))
+    op.add_column('data_collection_api_calls', sa.Column('new_places_found', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_data_collection_api_calls_parent_id', 'data_collection_api_calls',
+        'data_collection_api_calls', ['parent_id'], ['id']
+    )
+    op.create_index(op.f('ix_data_collection_api_calls_parent_id'), 'data_collection_api_calls', ['parent_id'], unique=False)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_data_collection_api_calls_parent_id'), table_name='data_collection_api_calls')
+    op.drop_constraint('fk_data_collection_api_calls_parent_id', 'data_collection_api_calls', type_='foreignkey')
+    op.drop_column('data_collection_api_calls', 'new_places_found')
+    op.drop_column('data_collection_api_calls', 'radius')
+    op.drop_column('data_collection_api_calls', 'cell_size')
+    op.drop_column('data_collection_api_calls', 'depth')
+    op.drop_column('data_collection_api_calls', 'parent_id')
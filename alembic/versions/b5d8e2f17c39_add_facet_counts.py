@@ -0,0 +1,116 @@
+"""add facet_counts maintained by triggers on restaurants and crawl cells
+
+Revision ID: b5d8e2f17c39
+Revises: 9e2b6c4f8a17
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d8e2f17c39'
+down_revision: Union[str, Sequence[str], None] = '9e2b6c4f8a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (facet, value, amount) rows each source row contributes
+RESTAURANT_FACETS = """
+    CREATE FUNCTION restaurant_facets(r restaurants) RETURNS TABLE (facet text, value text, amount bigint)
+    LANGUAGE sql IMMUTABLE AS $$
+        VALUES ('restaurants', NULL, 1),
+               ('city', r.city, 1),
+               ('cuisine_type', r.cuisine_type, 1),
+               ('price_range', r.price_range, 1),
+               ('halal_status', r.halal_status, 1),
+               ('rating', (floor(r.rating * 2) / 2)::numeric(2, 1)::text, 1)
+    $$
+"""
+
+CRAWL_CELL_FACETS = """
+    CREATE FUNCTION crawl_cell_facets(c data_collection_api_calls) RETURNS TABLE (facet text, value text, amount bigint)
+    LANGUAGE sql IMMUTABLE AS $$
+        VALUES ('cells', c.status, 1),
+               ('api_calls_made', NULL, coalesce(c.api_calls_made, 0)),
+               ('restaurants_found', NULL, coalesce(c.restaurants_found, 0))
+    $$
+"""
+
+# One INSERT of net deltas per statement, whatever its size. Writers only append, so
+# concurrent crawl workers and imports never wait on (or deadlock over) a shared counter row.
+TRACK_FACET_COUNTS = """
+    CREATE FUNCTION track_facet_counts() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        facets text := quote_ident(TG_ARGV[0]);
+        row_type text := format('%I.%I', TG_TABLE_SCHEMA, TG_TABLE_NAME);
+        deltas text;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            deltas := format('SELECT f.*, 1 AS sign FROM new_rows AS r, %s(r::%s) AS f', facets, row_type);
+        ELSIF TG_OP = 'DELETE' THEN
+            deltas := format('SELECT f.*, -1 AS sign FROM old_rows AS r, %s(r::%s) AS f', facets, row_type);
+        ELSE
+            deltas := format('SELECT f.*, 1 AS sign FROM new_rows AS r, %1$s(r::%2$s) AS f
+                              UNION ALL SELECT f.*, -1 FROM old_rows AS r, %1$s(r::%2$s) AS f', facets, row_type);
+        END IF;
+        EXECUTE format('INSERT INTO facet_counts (facet, value, count)
+                        SELECT facet, value, sum(amount * sign) FROM (%s) AS deltas
+                        GROUP BY facet, value HAVING sum(amount * sign) <> 0', deltas);
+        RETURN NULL;
+    END
+    $$
+"""
+
+TRIGGERS = [('restaurants', 'restaurant_facets'), ('data_collection_api_calls', 'crawl_cell_facets')]
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'facet_counts',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('facet', sa.String(), nullable=False),
+        sa.Column('value', sa.String(), nullable=True),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_facet_counts_facet_value', 'facet_counts', ['facet', 'value'], unique=False)
+
+    op.execute(RESTAURANT_FACETS)
+    op.execute(CRAWL_CELL_FACETS)
+    op.execute(TRACK_FACET_COUNTS)
+    for table, facets in TRIGGERS:
+        op.execute(f"""
+            CREATE TRIGGER {table}_facets_insert AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION track_facet_counts('{facets}')
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_facets_update AFTER UPDATE ON {table}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION track_facet_counts('{facets}')
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_facets_delete AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION track_facet_counts('{facets}')
+        """)
+
+        # Backfill from the rows saved so far
+        op.execute(f"""
+            INSERT INTO facet_counts (facet, value, count)
+            SELECT f.facet, f.value, sum(f.amount) FROM {table} AS r, {facets}(r) AS f
+            GROUP BY f.facet, f.value HAVING sum(f.amount) <> 0
+        """)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _ in TRIGGERS:
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f"DROP TRIGGER {table}_facets_{event} ON {table}")
+    op.execute("DROP FUNCTION track_facet_counts()")
+    op.execute("DROP FUNCTION crawl_cell_facets(data_collection_api_calls)")
+    op.execute("DROP FUNCTION restaurant_facets(restaurants)")
+    op.drop_index('ix_facet_counts_facet_value', table_name='facet_counts')
+    op.drop_table('facet_counts')
@@ -0,0 +1,28 @@
+"""add unique cell constraint to data_collection_api_calls
+
+Revision ID: c7e2a94f1b83
+Revises: a1f37b6d0c52
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a94f1b83'
+down_revision: Union[str, Sequence[str], None] = 'a1f37b6d0c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Legacy fixed-grid rows have no cell_size; NULLs never conflict, so they are left alone
+    op.create_unique_constraint(
+        'uq_data_collection_cell', 'data_collection_api_calls', ['latitude', 'longitude', 'cell_size']
+    )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_data_collection_cell', 'data_collection_api_calls', type_='unique')
@@ -0,0 +1,29 @@
+"""add lease columns to data_collection_api_calls
+
+Revision ID: d94b7a3e5f18
+Revises: c7e2a94f1b83
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd94b7a3e5f18'
+down_revision: Union[str, Sequence[str], None] = 'c7e2a94f1b83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('data_collection_api_calls', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('data_collection_api_calls', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_data_collection_claim', 'data_collection_api_calls', ['status', 'depth', 'id'], unique=False)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_data_collection_claim', table_name='data_collection_api_calls')
+    op.drop_column('data_collection_api_calls', 'lease_expires_at')
+    op.drop_column('data_collection_api_calls', 'lease_owner')
@@ -0,0 +1,60 @@
+"""add discovered_places table and compact raw responses
+
+Revision ID: e3a8c5d27b41
+Revises: d94b7a3e5f18
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a8c5d27b41'
+down_revision: Union[str, Sequence[str], None] = 'd94b7a3e5f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'discovered_places',
+        sa.Column('cell_id', sa.Integer(), nullable=False),
+        sa.Column('place_id', sa.String(), nullable=False),
+        sa.Column('query', sa.String(), nullable=True),
+        sa.Column('first_seen', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['cell_id'], ['data_collection_api_calls.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('cell_id', 'place_id')
+    )
+    op.create_index(op.f('ix_discovered_places_place_id'), 'discovered_places', ['place_id'], unique=False)
+
+    op.alter_column(
+        'data_collection_api_calls', 'response_body',
+        type_=postgresql.JSONB(), postgresql_using='response_body::jsonb'
+    )
+    op.add_column('data_collection_api_calls', sa.Column('response_body_gz', sa.LargeBinary(), nullable=True))
+
+    # Backfill the link table from the blobs of cells crawled so far
+    op.execute("""
+        INSERT INTO discovered_places (cell_id, place_id, first_seen)
+        SELECT cells.id, result ->> 'place_id', COALESCE(cells.processed_at, now())
+        FROM data_collection_api_calls AS cells
+        CROSS JOIN LATERAL jsonb_array_elements(
+            CASE WHEN jsonb_typeof(cells.response_body -> 'results') = 'array'
+                 THEN cells.response_body -> 'results' ELSE '[]'::jsonb END
+        ) AS result
+        WHERE result ->> 'place_id' IS NOT NULL
+        ON CONFLICT DO NOTHING
+    """)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('data_collection_api_calls', 'response_body_gz')
+    op.alter_column(
+        'data_collection_api_calls', 'response_body',
+        type_=sa.JSON(), postgresql_using='response_body::json'
+    )
+    op.drop_index(op.f('ix_discovered_places_place_id'), table_name='discovered_places')
+    op.drop_table('discovered_places')
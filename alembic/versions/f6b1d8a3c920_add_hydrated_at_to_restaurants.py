@@ -0,0 +1,27 @@
+"""add hydrated_at to restaurants
+
+Revision ID: f6b1d8a3c920
+Revises: e3a8c5d27b41
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b1d8a3c920'
+down_revision: Union[str, Sequence[str], None] = 'e3a8c5d27b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('restaurants', sa.Column('hydrated_at', sa.DateTime(timezone=True), nullable=True))
+    # Rows saved so far were fetched with reviews and photos already
+    op.execute("UPDATE restaurants SET hydrated_at = now() WHERE scraped_json::jsonb ? 'reviews' OR scraped_json::jsonb ? 'photos'")
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('restaurants', 'hydrated_at')
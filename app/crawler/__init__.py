@@ -0,0 +1 @@
+# Crawler package 
\ No newline at end of file
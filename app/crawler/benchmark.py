@@ -0,0 +1,139 @@
+"""
+Crawler throughput benchmark.
+
+Crawls a full grid (with adaptive splitting, in memory, no database) against the stand-in
+Places server, a recorded fixture file or any PLACES_BASE_URL, then optionally fetches
+details for every place found, and reports wall-clock, cells/s and calls/s:
+
+    poetry run python -m app.crawler.benchmark --latency-ms 80 --details
+    poetry run python -m app.crawler.benchmark --replay fixtures/places.jsonl
+"""
+import argparse
+import asyncio
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_fake_server(args: argparse.Namespace) -> str:
+    """Run the stand-in server on a background thread and return its base URL"""
+    import uvicorn
+    from app.crawler.fake_places import config_from_args, create_fake_places_app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        create_fake_places_app(config_from_args(args)), host="127.0.0.1", port=port, log_level="warning"
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+async def run_benchmark(api_key: str, step: float, concurrency: int, max_in_flight: int, details: bool) -> Dict[str, Any]:
+    from app.crawler.details import DETAILS_FIELDS
+    from app.crawler.engine import crawl_cells, fetch_place_details
+    from app.crawler.grid import coarse_cells, should_split, split_cell
+    from app.crawler.places import QUERY_LABELS
+    from app.crawler.query_planner import get_query_planner
+    from app.crawler.transport import request_counts
+
+    seen = set()
+    report = {"cells": 0, "cells_split": 0, "cell_errors": 0, "queries_skipped": 0}
+    level = coarse_cells(step)
+    started = time.perf_counter()
+    while level:
+        cells = [(i, cell["latitude"], cell["longitude"], cell["radius"], cell["depth"]) for i, cell in enumerate(level)]
+        results = {}
+        async for i, location_results, error in crawl_cells(cells, api_key, concurrency, max_in_flight, known_place_ids=seen):
+            report["cells"] += 1
+            if error is not None:
+                report["cell_errors"] += 1
+            else:
+                results[i] = location_results
+                report["queries_skipped"] += len(location_results.skipped_queries)
+
+        # Split in grid order rather than completion order, so runs (and replays) are repeatable
+        next_level = []
+        for i in sorted(results):
+            new_place_ids = set(results[i].found_by) - seen
+            seen.update(new_place_ids)
+            cell = level[i]
+            if should_split(cell["depth"], results[i].saturated, len(new_place_ids)):
+                report["cells_split"] += 1
+                next_level.extend(split_cell(cell["latitude"], cell["longitude"], cell["cell_size"], cell["depth"]))
+        level = next_level
+    crawl_seconds = time.perf_counter() - started
+    search_calls = sum(request_counts.values())
+
+    report.update({
+        "unique_places": len(seen),
+        "crawl_seconds": round(crawl_seconds, 2),
+        "cells_per_second": round(report["cells"] / crawl_seconds, 2) if crawl_seconds > 0 else 0,
+        "search_calls": search_calls,
+        "search_calls_per_second": round(search_calls / crawl_seconds, 2) if crawl_seconds > 0 else 0,
+    })
+
+    if details:
+        started = time.perf_counter()
+        fetched = 0
+        async for _, data, error in fetch_place_details(sorted(seen), api_key, DETAILS_FIELDS, max_in_flight):
+            if error is None and data.get("status") == "OK":
+                fetched += 1
+        details_seconds = time.perf_counter() - started
+        report.update({
+            "details_fetched": fetched,
+            "details_seconds": round(details_seconds, 2),
+            "details_per_second": round(fetched / details_seconds, 2) if details_seconds > 0 else 0,
+        })
+
+    report["calls_by_endpoint"] = dict(request_counts)
+    report["query_yield"] = get_query_planner(QUERY_LABELS).stats()["queries"]
+    return report
+
+def main():
+    from app.crawler.fake_places import add_config_arguments
+
+    parser = argparse.ArgumentParser(description="Benchmark the crawler against a stand-in Places API")
+    parser.add_argument("--step", type=float, default=0.02, help="coarse grid step in degrees")
+    parser.add_argument("--concurrency", type=int, default=10, help="cells crawled at once")
+    parser.add_argument("--max-in-flight", type=int, default=20, help="HTTP requests in flight")
+    parser.add_argument("--qps", type=float, default=1000, help="client-side rate limit")
+    parser.add_argument("--details", action="store_true", help="also fetch Place Details for every place found")
+    parser.add_argument("--base-url", help="crawl an already running server instead of starting one")
+    parser.add_argument("--replay", help="serve responses from a recorded JSONL fixture file")
+    parser.add_argument("--record", help="record every response to a JSONL fixture file")
+    parser.add_argument("--no-pruning", action="store_true", help="run every search query for every cell, paging each to the end")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    # The crawler modules read their settings at import time, so configure them first
+    os.environ["PLACES_CACHE_ENABLED"] = "false"
+    os.environ["PLACES_QPS"] = str(args.qps)
+    os.environ["PLACES_RATE_LIMIT_BACKEND"] = "memory"
+    if args.no_pruning:
+        os.environ["QUERY_PRUNING_ENABLED"] = "false"
+    if args.replay:
+        os.environ["PLACES_TRANSPORT"] = f"replay:{args.replay}"
+        os.environ["PLACES_PAGE_TOKEN_DELAY"] = "0"
+    else:
+        if args.record:
+            os.environ["PLACES_TRANSPORT"] = f"record:{args.record}"
+        if not args.base_url:
+            os.environ["PLACES_PAGE_TOKEN_DELAY"] = str(args.page_token_delay)
+        os.environ["PLACES_BASE_URL"] = args.base_url or start_fake_server(args)
+
+    # Only needed when recording from the real API
+    api_key = os.getenv("GOOGLE_MAPS_API_KEY", "benchmark")
+    report = asyncio.run(run_benchmark(api_key, args.step, args.concurrency, args.max_in_flight, args.details))
+    width = max(len(key) for key in report)
+    for key, value in report.items():
+        print(f"{key.ljust(width)}  {value}")
+
+if __name__ == "__main__":
+    main()
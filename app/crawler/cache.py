@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+PLACES_CACHE_ENABLED = os.getenv("PLACES_CACHE_ENABLED", "true").lower() == "true"
+PLACES_CACHE_PATH = os.getenv("PLACES_CACHE_PATH", ".cache/places_cache.sqlite3")
+PLACES_CACHE_TTL_DAYS = float(os.getenv("PLACES_CACHE_TTL_DAYS", "30"))
+PLACES_CACHE_MAX_MB = float(os.getenv("PLACES_CACHE_MAX_MB", "1024"))
+EVICT_EVERY = 200  # writes between size checks
+
+class ResponseCache:
+    """
+    On-disk cache of raw Google Places payloads in a local SQLite file.
+    Payloads are stored zlib-compressed; entries older than the TTL are treated as misses,
+    and once the file holds more than `max_bytes` the least recently used entries go first.
+    Calls block on disk I/O; async callers run them in a thread (see PlacesClient.cached).
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes_since_evict = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT payload, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, key: str, payload: Dict[str, Any]):
+        data = zlib.compress(json.dumps(payload).encode("utf-8"))
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now)
+            )
+            self.connection.commit()
+            self.writes_since_evict += 1
+            if self.writes_since_evict >= EVICT_EVERY:
+                self._evict()
+                self.writes_since_evict = 0
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until the cache fits in max_bytes"""
+        self.connection.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            # Oldest-accessed entries until their combined size covers the excess
+            self.connection.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed_at) - size AS freed_before
+                        FROM responses
+                    ) WHERE freed_before < ?
+                )
+            """, (total - self.max_bytes,))
+        self.connection.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            entries, size = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "entries": entries,
+                "size_bytes": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups > 0 else 0,
+                "ttl_days": round(self.ttl_seconds / 86400, 2)
+            }
+
+def request_signature(kind: str, params: Dict[str, Any]) -> str:
+    """Cache key for a search request: its kind plus a hash of its parameters (never the API key)"""
+    canonical = json.dumps({k: v for k, v in params.items() if k != "key"}, sort_keys=True)
+    return f"{kind}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+_places_cache: Optional[ResponseCache] = None
+_places_cache_lock = threading.Lock()
+
+def get_places_cache() -> Optional[ResponseCache]:
+    """Process-wide Places response cache, or None when caching is disabled"""
+    global _places_cache
+    if not PLACES_CACHE_ENABLED:
+        return None
+    with _places_cache_lock:
+        if _places_cache is None:
+            _places_cache = ResponseCache(
+                PLACES_CACHE_PATH,
+                ttl_seconds=PLACES_CACHE_TTL_DAYS * 86400,
+                max_bytes=int(PLACES_CACHE_MAX_MB * 1024 * 1024)
+            )
+        return _places_cache
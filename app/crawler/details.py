@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from sqlalchemy import cast, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.models.restaurant import Restaurant
+
+# Fields requested from the Place Details endpoint during the crawl: everything the
+# restaurants columns and list views need
+DETAILS_FIELDS = "name,formatted_address,formatted_phone_number,website,rating,user_ratings_total,opening_hours,price_level,types,business_status,geometry,url"
+# Large fields fetched later, only for restaurants that are viewed or need halal classification
+HEAVY_DETAILS_FIELDS = "reviews,photos"
+
+def merge_heavy_fields(restaurant, restaurant_details: Dict[str, Any]):
+    """Add the heavy fields of a Place Details result to a restaurant's scraped_json and mark it hydrated"""
+    heavy = {field: restaurant_details[field] for field in HEAVY_DETAILS_FIELDS.split(",") if field in restaurant_details}
+    # Merged by Postgres (jsonb ||), so the stored payload is never loaded into Python
+    restaurant.scraped_json = func.coalesce(Restaurant.scraped_json, cast({}, JSONB)).op("||")(cast(heavy, JSONB))
+    restaurant.hydrated_at = datetime.now(timezone.utc)
+
+def build_restaurant_data(place_id: str, restaurant_details: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Place Details result onto the columns of the restaurants table"""
+    # Extract address components
+    address_components = restaurant_details.get("address_components", [])
+    city = None
+    state = None
+    country = None
+
+    for component in address_components:
+        types = component.get("types", [])
+        if "locality" in types:
+            city = component.get("long_name")
+        elif "administrative_area_level_1" in types:
+            state = component.get("long_name")
+        elif "country" in types:
+            country = component.get("long_name")
+
+    return {
+        "place_id": place_id,
+        "name": restaurant_details.get("name"),
+        "description": restaurant_details.get("editorial_summary", {}).get("overview"),
+        "address": restaurant_details.get("formatted_address"),
+        "city": city,
+        "state": state,
+        "country": country,
+        "latitude": restaurant_details.get("geometry", {}).get("location", {}).get("lat"),
+        "longitude": restaurant_details.get("geometry", {}).get("location", {}).get("lng"),
+        "phone": restaurant_details.get("formatted_phone_number"),
+        "website": restaurant_details.get("website"),
+        "opening_hours": str(restaurant_details.get("opening_hours", {}).get("weekday_text", [])) if restaurant_details.get("opening_hours") else None,
+        "cuisine_type": ", ".join(restaurant_details.get("types", [])),
+        "price_range": "$" * restaurant_details.get("price_level", 0) if restaurant_details.get("price_level") else None,
+        "halal_status": None,  # Halal status needs to be verified manually
+        "rating": restaurant_details.get("rating"),
+        "user_ratings_total": restaurant_details.get("user_ratings_total"),
+        "business_status": restaurant_details.get("business_status"),
+        "types": restaurant_details.get("types"),
+        "scraped_json": restaurant_details,
+        "additional_info": f"User ratings: {restaurant_details.get('user_ratings_total', 0)}"
+    }
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, Set, Tuple
+
+from app.crawler.places import LocationResults, PlacesClient, create_http_client, get_all_restaurants_for_location
+
+DEFAULT_CONCURRENCY = 10  # cells crawled at the same time
+DEFAULT_MAX_IN_FLIGHT = 20  # HTTP requests in flight across all cells
+
+# (cell id, latitude, longitude, search radius in meters, depth)
+Cell = Tuple[int, float, float, int, int]
+
+async def bounded_map(items: Iterable[Any], worker: Callable[[Any], Awaitable[Any]], concurrency: int) -> AsyncIterator[Any]:
+    """
+    Run `worker` over `items` with at most `concurrency` running at once.
+    Items are pulled from the iterable lazily, so it can be a generator over a large set.
+    Yields results in completion order.
+    """
+    iterator = iter(items)
+    running = set()
+    try:
+        while True:
+            for item in iterator:
+                running.add(asyncio.create_task(worker(item)))
+                if len(running) >= concurrency:
+                    break
+            if not running:
+                return
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # Stop outstanding work if the consumer bails out early
+        for task in running:
+            task.cancel()
+
+async def crawl_cells(
+    cells: Iterable[Cell],
+    api_key: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    known_place_ids: Optional[Set[str]] = None,
+) -> AsyncIterator[Tuple[int, Optional[LocationResults], Optional[Exception]]]:
+    """
+    Crawl grid cells concurrently over one pooled HTTP client.
+    Yields (cell_id, results, error) in completion order; exactly one of results/error is set.
+    `known_place_ids` lets queries of coarse cells stop paging once a page brings nothing new.
+    """
+    async with create_http_client(max_connections=max_in_flight) as http:
+        client = PlacesClient(http, api_key, max_in_flight=max_in_flight)
+
+        async def crawl(cell: Cell):
+            cell_id, lat, lng, radius, depth = cell
+            try:
+                results = await get_all_restaurants_for_location(client, lat, lng, radius, known_place_ids, depth=depth)
+                return cell_id, results, None
+            except Exception as e:
+                return cell_id, None, e
+
+        async for result in bounded_map(cells, crawl, concurrency):
+            yield result
+
+async def fetch_place_details(
+    place_ids: Iterable[str],
+    api_key: str,
+    fields: str,
+    concurrency: int = DEFAULT_MAX_IN_FLIGHT,
+) -> AsyncIterator[Tuple[str, Optional[dict], Optional[Exception]]]:
+    """
+    Fetch Place Details for many place_ids concurrently under the shared quota.
+    Yields (place_id, response, error) in completion order.
+    """
+    async with create_http_client(max_connections=concurrency) as http:
+        client = PlacesClient(http, api_key, max_in_flight=concurrency)
+
+        async def fetch(place_id: str):
+            try:
+                return place_id, await client.details(place_id, fields), None
+            except Exception as e:
+                return place_id, None, e
+
+        async for result in bounded_map(place_ids, fetch, concurrency):
+            yield result
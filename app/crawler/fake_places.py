@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.crawler.grid import max_lat, max_long, min_lat, min_long
+
+PAGE_SIZE = 20
+RESULT_CAP = 60
+BUCKET_SIZE = 0.01  # degrees per side of a spatial index bucket
+
+# Which place types each search template matches; anything else matches every restaurant
+QUERY_TYPES = {
+    "fast food": {"meal_takeaway", "fast_food"},
+    "cafes": {"cafe"},
+    "food courts": {"food_court"},
+    "takeout": {"meal_takeaway"},
+}
+PLACE_TYPES = ["restaurant", "cafe", "meal_takeaway", "fast_food", "food_court", "bakery"]
+
+@dataclass
+class FakePlacesConfig:
+    """Behaviour of the stand-in server"""
+    restaurants: int = 5000  # size of the synthetic distribution
+    clusters: int = 12  # dense areas (plazas, downtown strips); the rest is spread uniformly
+    cluster_share: float = 0.6  # fraction of restaurants that sit in a cluster
+    seed: int = 42
+    places_file: Optional[str] = None  # JSON list of recorded places to serve instead of synthetic ones
+    latency_ms: float = 0  # mean added latency per request
+    jitter_ms: float = 0
+    error_rate: float = 0  # fraction of requests answered with HTTP 500
+    over_query_limit_rate: float = 0  # fraction answered with status OVER_QUERY_LIMIT
+    max_qps: float = 0  # above this many requests per second answer OVER_QUERY_LIMIT (0 = unlimited)
+    page_token_delay: float = 2.0  # seconds before a next_page_token is accepted
+
+def haversine_meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6_371_000 * math.asin(math.sqrt(a))
+
+def synthetic_places(config: FakePlacesConfig) -> List[Dict[str, Any]]:
+    """Restaurants spread over the crawl region, part of them in gaussian clusters"""
+    rng = random.Random(config.seed)
+    centres = [(rng.uniform(min_lat, max_lat), rng.uniform(min_long, max_long), rng.uniform(0.002, 0.01))
+               for _ in range(config.clusters)]
+    places = []
+    for i in range(config.restaurants):
+        if centres and rng.random() < config.cluster_share:
+            lat, lng, spread = rng.choice(centres)
+            lat, lng = rng.gauss(lat, spread), rng.gauss(lng, spread)
+        else:
+            lat, lng = rng.uniform(min_lat, max_lat), rng.uniform(min_long, max_long)
+        types = ["restaurant", *rng.sample(PLACE_TYPES[1:], rng.randint(0, 2)), "food", "point_of_interest"]
+        places.append({
+            "place_id": f"fake_{i:06d}",
+            "name": f"Restaurant {i}",
+            "geometry": {"location": {"lat": round(lat, 7), "lng": round(lng, 7)}},
+            "types": types,
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+            "user_ratings_total": rng.randint(0, 2000),
+            "price_level": rng.randint(1, 4),
+            "business_status": "OPERATIONAL",
+            "formatted_address": f"{rng.randint(1, 9999)} Main St, Mississauga, ON, Canada",
+            "formatted_phone_number": f"(905) 555-{rng.randint(0, 9999):04d}",
+            "website": f"https://example.com/restaurant-{i}",
+            "url": f"https://maps.google.com/?cid={i}",
+            "opening_hours": {"open_now": True, "weekday_text": ["Monday: 11:00 AM – 10:00 PM"]},
+            "reviews": [{"author_name": "Guest", "rating": 5, "text": "Great food"}],
+            "photos": [{"photo_reference": f"photo_{i}", "height": 800, "width": 1200}],
+        })
+    return places
+
+class FakePlaces:
+    """In-memory Places data set with a bucketed spatial index and Google-like paging"""
+
+    def __init__(self, config: FakePlacesConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        if config.places_file:
+            with open(config.places_file) as f:
+                self.places = json.load(f)
+        else:
+            self.places = synthetic_places(config)
+        self.by_id = {place["place_id"]: place for place in self.places}
+        self.buckets = defaultdict(list)
+        for place in self.places:
+            location = place["geometry"]["location"]
+            self.buckets[self._bucket(location["lat"], location["lng"])].append(place)
+        # next_page_token -> (remaining results, monotonic time it becomes valid)
+        self.page_tokens: Dict[str, Any] = {}
+        self.requests = Counter()
+        self.window_start = time.monotonic()
+        self.window_count = 0
+
+    @staticmethod
+    def _bucket(lat: float, lng: float):
+        return int(math.floor(lat / BUCKET_SIZE)), int(math.floor(lng / BUCKET_SIZE))
+
+    def within(self, lat: float, lng: float, radius: float) -> List[Dict[str, Any]]:
+        """Places within `radius` meters, nearest first"""
+        reach_lat = radius / 111_320
+        reach_lng = radius / (111_320 * max(math.cos(math.radians(lat)), 0.01))
+        low, high = self._bucket(lat - reach_lat, lng - reach_lng), self._bucket(lat + reach_lat, lng + reach_lng)
+        found = []
+        for i in range(low[0], high[0] + 1):
+            for j in range(low[1], high[1] + 1):
+                for place in self.buckets.get((i, j), ()):
+                    location = place["geometry"]["location"]
+                    distance = haversine_meters(lat, lng, location["lat"], location["lng"])
+                    if distance <= radius:
+                        found.append((distance, place))
+        found.sort(key=lambda item: item[0])
+        return [place for _, place in found]
+
+    def page(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """First page of a result list; the rest is parked behind a next_page_token"""
+        if not results:
+            return {"status": "ZERO_RESULTS", "results": []}
+        response = {"status": "OK", "results": [summary(place) for place in results[:PAGE_SIZE]]}
+        if len(results) > PAGE_SIZE:
+            token = uuid.uuid4().hex
+            self.page_tokens[token] = (results[PAGE_SIZE:], time.monotonic() + self.config.page_token_delay)
+            response["next_page_token"] = token
+        return response
+
+    def next_page(self, token: str) -> Dict[str, Any]:
+        parked = self.page_tokens.get(token)
+        if parked is None:
+            return {"status": "INVALID_REQUEST", "results": [], "error_message": "Unknown page token"}
+        results, ready_at = parked
+        if time.monotonic() < ready_at:
+            # Like Google, a token used too early is rejected and stays valid for later
+            return {"status": "INVALID_REQUEST", "results": []}
+        del self.page_tokens[token]
+        return self.page(results)
+
+    def text_search(self, params: Dict[str, str]) -> Dict[str, Any]:
+        if params.get("pagetoken"):
+            return self.next_page(params["pagetoken"])
+        lat, lng = map(float, params["location"].split(","))
+        label = params.get("query", "").split(" near ")[0]
+        wanted = QUERY_TYPES.get(label)
+        results = [place for place in self.within(lat, lng, float(params.get("radius", 1500)))
+                   if wanted is None or wanted & set(place.get("types", []))]
+        return self.page(results[:RESULT_CAP])
+
+    def nearby_search(self, params: Dict[str, str]) -> Dict[str, Any]:
+        if params.get("pagetoken"):
+            return self.next_page(params["pagetoken"])
+        lat, lng = map(float, params["location"].split(","))
+        return self.page(self.within(lat, lng, float(params.get("radius", 1500)))[:RESULT_CAP])
+
+    def details(self, params: Dict[str, str]) -> Dict[str, Any]:
+        place = self.by_id.get(params.get("place_id"))
+        if place is None:
+            return {"status": "NOT_FOUND"}
+        fields = params.get("fields")
+        if fields:
+            place = {field: place[field] for field in fields.split(",") if field in place}
+        return {"status": "OK", "result": place}
+
+    def throttled(self) -> bool:
+        """Failure injection shared by every endpoint"""
+        if self.config.max_qps > 0:
+            now = time.monotonic()
+            if now - self.window_start >= 1:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            if self.window_count > self.config.max_qps:
+                return True
+        return self.rng.random() < self.config.over_query_limit_rate
+
+def summary(place: Dict[str, Any]) -> Dict[str, Any]:
+    """Search results carry only the basic fields, like Google's"""
+    return {key: place[key] for key in ("place_id", "name", "geometry", "types", "rating",
+                                        "user_ratings_total", "business_status") if key in place}
+
+def create_fake_places_app(config: Optional[FakePlacesConfig] = None) -> FastAPI:
+    """ASGI app serving /textsearch/json, /nearbysearch/json and /details/json like the Places web service"""
+    config = config or FakePlacesConfig()
+    places = FakePlaces(config)
+    app = FastAPI(title="Fake Google Places")
+    app.state.places = places
+
+    async def serve(request: Request, endpoint: str, handler):
+        places.requests[endpoint] += 1
+        if config.latency_ms or config.jitter_ms:
+            delay = max(0.0, places.rng.gauss(config.latency_ms, config.jitter_ms)) / 1000
+            await asyncio.sleep(delay)
+        if places.rng.random() < config.error_rate:
+            places.requests["http_errors"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+        if places.throttled():
+            places.requests["over_query_limit"] += 1
+            return {"status": "OVER_QUERY_LIMIT", "results": [], "error_message": "You have exceeded your rate-limit for this API."}
+        return handler(dict(request.query_params))
+
+    @app.get("/textsearch/json")
+    async def text_search(request: Request):
+        return await serve(request, "textsearch", places.text_search)
+
+    @app.get("/nearbysearch/json")
+    async def nearby_search(request: Request):
+        return await serve(request, "nearbysearch", places.nearby_search)
+
+    @app.get("/details/json")
+    async def details(request: Request):
+        return await serve(request, "details", places.details)
+
+    @app.get("/stats")
+    def stats():
+        return {"places": len(places.places), "requests": dict(places.requests)}
+
+    return app
+
+def config_from_args(args: argparse.Namespace) -> FakePlacesConfig:
+    return FakePlacesConfig(
+        restaurants=args.restaurants, seed=args.seed, places_file=args.places_file,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        over_query_limit_rate=args.over_query_limit_rate, max_qps=args.max_qps,
+        page_token_delay=args.page_token_delay,
+    )
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    defaults = FakePlacesConfig()
+    parser.add_argument("--restaurants", type=int, default=defaults.restaurants)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--places-file", help="JSON list of places to serve instead of a synthetic set")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--over-query-limit-rate", type=float, default=defaults.over_query_limit_rate)
+    parser.add_argument("--max-qps", type=float, default=defaults.max_qps)
+    parser.add_argument("--page-token-delay", type=float, default=defaults.page_token_delay)
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Stand-in Google Places server for local crawls")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    print(f"Point the crawler at it with PLACES_BASE_URL=http://{args.host}:{args.port}")
+    uvicorn.run(create_fake_places_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
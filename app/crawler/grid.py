@@ -0,0 +1,88 @@
+import math
+from typing import Dict, List
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.data_collection import data_collection_api_calls
+
+# Region covered by the crawl (Mississauga)
+min_lat = 43.47
+max_lat = 43.63
+min_long = -79.81
+max_long = -79.63
+
+COARSE_STEP = 0.02  # side of a depth-0 cell in degrees (~2.2 km north-south)
+MAX_DEPTH = 4  # 0.02 / 2**4 = 0.00125 degrees (~140 m) at the deepest level
+SPLIT_NEW_PLACES = 40  # split a cell that still finds this many new place_ids
+
+METERS_PER_DEGREE = 111_320
+INSERT_CHUNK_SIZE = 5000  # rows per multi-row INSERT
+
+def cell_radius(lat: float, size: float) -> int:
+    """Search radius in meters that covers a square cell of `size` degrees centred at `lat`"""
+    half_lat = size / 2 * METERS_PER_DEGREE
+    half_lng = size / 2 * METERS_PER_DEGREE * math.cos(math.radians(lat))
+    return int(math.ceil(math.hypot(half_lat, half_lng)))
+
+def coarse_cells(step: float = COARSE_STEP) -> List[Dict]:
+    """Depth-0 cells tiling the crawl region"""
+    if step <= 0:
+        raise ValueError(f"Grid step must be positive, got {step}")
+    lat_length = int(math.ceil((max_lat - min_lat) / step))
+    long_length = int(math.ceil((max_long - min_long) / step))
+
+    cells = []
+    for i in range(lat_length):
+        lat = round(min_lat + (i + 0.5) * step, 6)
+        for j in range(long_length):
+            long = round(min_long + (j + 0.5) * step, 6)
+            cells.append({
+                "latitude": lat,
+                "longitude": long,
+                "cell_size": step,
+                "radius": cell_radius(lat, step),
+                "depth": 0,
+            })
+    return cells
+
+def split_cell(latitude: float, longitude: float, cell_size: float, depth: int) -> List[Dict]:
+    """The four quadrant children of a cell"""
+    size = cell_size / 2
+    offset = size / 2
+    children = []
+    for d_lat in (-offset, offset):
+        for d_lng in (-offset, offset):
+            lat = round(latitude + d_lat, 6)
+            children.append({
+                "latitude": lat,
+                "longitude": round(longitude + d_lng, 6),
+                "cell_size": size,
+                "radius": cell_radius(lat, size),
+                "depth": depth + 1,
+            })
+    return children
+
+def should_split(depth: int, saturated: bool, new_places: int) -> bool:
+    """
+    Split a cell when Google truncated one of its queries at the result cap, or when it
+    is still yielding many place_ids no other cell has found.
+    """
+    if depth >= MAX_DEPTH:
+        return False
+    return saturated or new_places >= SPLIT_NEW_PLACES
+
+def insert_cells(db: Session, cells: List[Dict]) -> int:
+    """
+    Insert pending cells with multi-row INSERT ... ON CONFLICT DO NOTHING on the cell's
+    unique (latitude, longitude, cell_size) key. Returns the number of new rows.
+    Does not commit.
+    """
+    inserted = 0
+    for i in range(0, len(cells), INSERT_CHUNK_SIZE):
+        chunk = [{"status": "pending", **cell} for cell in cells[i:i + INSERT_CHUNK_SIZE]]
+        statement = insert(data_collection_api_calls).values(chunk).on_conflict_do_nothing(
+            constraint="uq_data_collection_cell"
+        )
+        inserted += db.execute(statement).rowcount
+    return inserted
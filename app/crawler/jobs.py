@@ -0,0 +1,177 @@
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database.connection import engine
+from app.models.crawl_job import CrawlJob
+
+CRAWL_JOB_WORKERS = int(os.getenv("CRAWL_JOB_WORKERS", "2"))
+# Set to "false" when jobs are run by a separate `python -m app.crawler.worker` process
+CRAWL_JOBS_IN_PROCESS = os.getenv("CRAWL_JOBS_IN_PROCESS", "true").lower() == "true"
+PROGRESS_INTERVAL = 2.0  # seconds between progress writes / cancellation checks
+
+# job_type -> handler(db, params, progress) returning the job's result summary
+JOB_HANDLERS: Dict[str, Callable[[Session, Dict[str, Any], "JobProgress"], Dict[str, Any]]] = {}
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested"""
+
+class JobProgress:
+    """
+    Progress counters for a running job.
+    Counters are written to the crawl_jobs row at most every PROGRESS_INTERVAL seconds,
+    and the same write picks up a pending cancellation request.
+    """
+
+    def __init__(self, db: Session, job: CrawlJob):
+        self.db = db
+        self.job = job
+        # Kept in memory so a rollback of the work in the session cannot lose them
+        self.total = 0
+        self.processed = 0
+        self.errors = 0
+        self.api_calls = 0
+        self.last_flush = time.monotonic()
+
+    def set_total(self, total: int):
+        self.total = total
+        self.flush()
+
+    def advance(self, processed: int = 0, errors: int = 0, api_calls: int = 0):
+        self.processed += processed
+        self.errors += errors
+        self.api_calls += api_calls
+        if time.monotonic() - self.last_flush >= PROGRESS_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Commit the counters (and any pending work in the session), then check for cancellation"""
+        self.job.total_items = self.total
+        self.job.processed_items = self.processed
+        self.job.error_items = self.errors
+        self.job.api_calls = self.api_calls
+        self.db.commit()
+        self.last_flush = time.monotonic()
+        if self.job.cancel_requested:
+            raise JobCancelled()
+
+def job_handler(job_type: str):
+    """Register a function as the handler for a job type"""
+    def register(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return register
+
+def submit_job(db: Session, job_type: str, params: Dict[str, Any]) -> CrawlJob:
+    """Queue a job and, unless a separate worker runs jobs, start it in the background"""
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    job = CrawlJob(job_type=job_type, status="queued", params=params, total_items=0,
+                   processed_items=0, error_items=0, api_calls=0, cancel_requested=False)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    if CRAWL_JOBS_IN_PROCESS:
+        global _executor
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=CRAWL_JOB_WORKERS, thread_name_prefix="crawl-job")
+        _executor.submit(run_job, job.id)
+    return job
+
+def _claim_job(db: Session, job_id: int) -> bool:
+    """Move a queued job to running; False if another worker got it first or it was cancelled"""
+    claimed = db.execute(
+        text("UPDATE crawl_jobs SET status = 'running', started_at = now() WHERE id = :id AND status = 'queued'"),
+        {"id": job_id}
+    )
+    db.commit()
+    return claimed.rowcount == 1
+
+def run_job(job_id: int, claimed: bool = False):
+    """
+    Run a queued job to completion in its own database session. `claimed` jobs were already
+    moved to running by claim_next_job.
+    """
+    with Session(engine) as db:
+        if not claimed and not _claim_job(db, job_id):
+            return
+
+        job = db.get(CrawlJob, job_id)
+        progress = JobProgress(db, job)
+        print(f"Starting crawl job {job.id} ({job.job_type})")
+        try:
+            result = JOB_HANDLERS[job.job_type](db, job.params or {}, progress)
+            job.status = "completed"
+            job.result = result
+        except JobCancelled:
+            db.rollback()
+            job.status = "cancelled"
+        except Exception as e:
+            traceback.print_exc()
+            db.rollback()
+            job.status = "failed"
+            job.error_message = str(e)
+
+        job.total_items = progress.total
+        job.processed_items = progress.processed
+        job.error_items = progress.errors
+        job.api_calls = progress.api_calls
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        print(f"Crawl job {job.id} finished with status {job.status}")
+
+def cancel_job(db: Session, job: CrawlJob) -> CrawlJob:
+    """Request cancellation; queued jobs are cancelled at once, running ones at their next progress write"""
+    if job.status in ("queued", "running"):
+        job.cancel_requested = True
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def job_rates(job: CrawlJob) -> Dict[str, Any]:
+    """Percent complete, throughput and ETA derived from a job's counters"""
+    done = (job.processed_items or 0) + (job.error_items or 0)
+    total = job.total_items or 0
+    rates = {"percent_complete": round(done / total * 100, 2) if total > 0 else 0,
+             "items_per_second": 0, "calls_per_second": 0, "eta_seconds": None}
+    if not job.started_at:
+        return rates
+
+    end = job.finished_at or datetime.now(timezone.utc)
+    elapsed = (end - job.started_at).total_seconds()
+    if elapsed > 0:
+        rates["items_per_second"] = round(done / elapsed, 2)
+        rates["calls_per_second"] = round((job.api_calls or 0) / elapsed, 2)
+    if job.status == "running" and rates["items_per_second"] > 0:
+        rates["eta_seconds"] = round((total - done) / rates["items_per_second"], 1)
+    return rates
+
+# Take the oldest queued job and mark it running in one statement, so the row lock taken
+# by SKIP LOCKED is held until the job is no longer queued
+CLAIM_NEXT_JOB_SQL = text("""
+    UPDATE crawl_jobs SET status = 'running', started_at = now()
+    WHERE id = (
+        SELECT id FROM crawl_jobs WHERE status = 'queued'
+        ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id
+""")
+
+def claim_next_job(db: Session) -> Optional[int]:
+    """Claim the oldest queued job for a separate worker process; run it with run_job(job_id, claimed=True)"""
+    job_id = db.execute(CLAIM_NEXT_JOB_SQL).scalar()
+    db.commit()
+    return job_id
@@ -0,0 +1,96 @@
+import os
+import socket
+import uuid
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.data_collection import data_collection_api_calls
+
+CRAWL_LEASE_SECONDS = int(os.getenv("CRAWL_LEASE_SECONDS", "600"))
+
+# Take up to :limit unleased (or expired) cells with the given status. SKIP LOCKED lets
+# concurrent workers claim disjoint batches without waiting on each other.
+CLAIM_SQL = """
+    UPDATE data_collection_api_calls
+    SET lease_owner = :worker_id,
+        lease_expires_at = now() + make_interval(secs => :lease_seconds)
+    WHERE id IN (
+        SELECT id FROM data_collection_api_calls
+        WHERE status = :status
+          AND (lease_expires_at IS NULL OR lease_expires_at < now())
+          AND (CAST(:since AS timestamptz) IS NULL OR updated_at IS NULL OR updated_at < :since)
+          {conditions}
+        ORDER BY {order_by}
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id
+"""
+
+# Pending cells: coarse before fine, in grid order
+PENDING_CLAIM_SQL = text(CLAIM_SQL.format(conditions="", order_by="depth, id"))
+
+# Failed cells that are due and have retries left, as a priority queue: fewest retries
+# first, then the error classes most likely to have cleared, then the oldest failures
+RETRY_CLAIM_SQL = text(CLAIM_SQL.format(
+    conditions="""AND retry_count < max_retries
+          AND (NOT :due_only OR next_retry_at IS NULL OR next_retry_at <= now())""",
+    order_by="""retry_count,
+                 CASE error_class WHEN 'network' THEN 0 WHEN 'upstream' THEN 1 WHEN 'quota' THEN 2 ELSE 3 END,
+                 updated_at NULLS FIRST, id""",
+))
+
+def new_worker_id() -> str:
+    """Identifies one crawl run in the lease columns"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def claim_cells(db: Session, worker_id: str, status: str, limit: int, since: Optional[datetime] = None,
+                lease_seconds: int = CRAWL_LEASE_SECONDS, due_only: bool = True):
+    """
+    Lease a batch of cells to this worker and return them. Failed cells ("error") come from
+    the retry queue, so only those that are due are claimed unless `due_only` is False. `since` skips rows updated
+    after that time, so a retry pass does not pick up cells it has just failed itself.
+    Commits so other workers see the lease immediately.
+    """
+    statement = RETRY_CLAIM_SQL if status == "error" else PENDING_CLAIM_SQL
+    ids = [row_id for (row_id,) in db.execute(statement, {
+        "worker_id": worker_id,
+        "lease_seconds": lease_seconds,
+        "status": status,
+        "since": since,
+        "limit": limit,
+        "due_only": due_only,
+    })]
+    db.commit()
+    if not ids:
+        return []
+    return db.query(data_collection_api_calls).filter(
+        data_collection_api_calls.id.in_(ids)
+    ).order_by(data_collection_api_calls.depth, data_collection_api_calls.id).all()
+
+def claimed_cells(db: Session, worker_id: str, status: str, batch_size: int,
+                  since: Optional[datetime] = None, due_only: bool = True) -> Iterator[data_collection_api_calls]:
+    """Keep claiming small batches until no claimable cell is left"""
+    while True:
+        batch = claim_cells(db, worker_id, status, batch_size, since=since, due_only=due_only)
+        if not batch:
+            return
+        yield from batch
+
+def release_lease(db: Session, record: data_collection_api_calls, worker_id: str) -> bool:
+    """
+    Clear this worker's lease on a cell before its result is written. The row stays locked
+    until the next commit, so no other worker can claim it in between. False if the lease
+    expired and another worker has claimed the cell since; the result must then be dropped.
+    """
+    released = db.query(data_collection_api_calls).filter(
+        data_collection_api_calls.id == record.id,
+        data_collection_api_calls.lease_owner == worker_id,
+    ).update({
+        data_collection_api_calls.lease_owner: None,
+        data_collection_api_calls.lease_expires_at: None,
+    }, synchronize_session="evaluate")
+    return released == 1
@@ -0,0 +1,105 @@
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Upstream latency buckets in seconds; Google usually answers in 100-500 ms
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(**labels: str) -> Labels:
+    return tuple(sorted(labels.items()))
+
+def _format_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = _labels(**labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        # labels -> (per-bucket counts, the last one being +Inf, sum)
+        self.values: Dict[Labels, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = _labels(**labels)
+        counts, total = self.values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.values[key] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+class PlacesMetrics:
+    """
+    Process-wide record of every outbound Google Places call: count by endpoint and
+    status, latency histogram and response bytes. Rendered in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = Counter("places_api_calls_total", "Google Places API calls by endpoint and response status")
+        self.latency = Histogram("places_api_latency_seconds", "Google Places API call latency by endpoint")
+        self.response_bytes = Counter("places_api_response_bytes_total", "Bytes received from the Google Places API")
+        self.cache_hits = Counter("places_cache_hits_total", "Places requests answered from the response cache")
+        self.retries = Counter("places_api_retries_total", "Google Places API calls retried, by endpoint and reason")
+        self.breaker_trips = Counter("places_circuit_breaker_trips_total", "Times the Places circuit breaker opened")
+
+    def record_call(self, endpoint: str, status: str, seconds: float, size: int):
+        with self.lock:
+            self.calls.inc(endpoint=endpoint, status=status)
+            self.latency.observe(seconds, endpoint=endpoint)
+            self.response_bytes.inc(size, endpoint=endpoint)
+
+    def record_cache_hit(self, endpoint: str):
+        with self.lock:
+            self.cache_hits.inc(endpoint=endpoint)
+
+    def record_retry(self, endpoint: str, reason: str):
+        with self.lock:
+            self.retries.inc(endpoint=endpoint, reason=reason)
+
+    def record_breaker_trip(self):
+        with self.lock:
+            self.breaker_trips.inc()
+
+    def render(self) -> str:
+        with self.lock:
+            lines = []
+            for metric in (self.calls, self.latency, self.response_bytes, self.cache_hits, self.retries, self.breaker_trips):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+places_metrics = PlacesMetrics()
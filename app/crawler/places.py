@@ -0,0 +1,331 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+import httpx
+
+from app.crawler.cache import ResponseCache, get_places_cache, request_signature
+from app.crawler.metrics import places_metrics
+from app.crawler.query_planner import QueryPlanner, get_query_planner
+from app.crawler.rate_limiter import TokenBucket, get_places_limiter
+from app.crawler.retry import (RETRIABLE_HTTP_STATUSES, RETRIABLE_STATUSES, CircuitBreaker, RetryPolicy,
+                               classify_error, get_places_breaker, status_error_class)
+from app.crawler.transport import places_transport
+
+# Point at a local stand-in (python -m app.crawler.fake_places) to crawl without quota
+PLACES_BASE_URL = os.getenv("PLACES_BASE_URL", "https://maps.googleapis.com/maps/api/place")
+SEARCH_RADIUS = 1500
+PAGE_TOKEN_DELAY = float(os.getenv("PLACES_PAGE_TOKEN_DELAY", "2"))  # Google needs a short delay before a next_page_token becomes valid
+RESULT_CAP = 60  # Google stops paginating a query after 3 pages of 20
+
+# Multiple search queries for better coverage
+SEARCH_QUERIES = [
+    "restaurants near {lat},{lng}",
+    "fast food near {lat},{lng}",
+    "cafes near {lat},{lng}",
+    "food courts near {lat},{lng}",
+    "takeout near {lat},{lng}"
+]
+
+def create_http_client(max_connections: int = 20) -> httpx.AsyncClient:
+    """Create a pooled keep-alive HTTP client shared by every Places call of a crawl"""
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(base_url=PLACES_BASE_URL, transport=places_transport(limits), timeout=httpx.Timeout(30.0))
+
+class PlacesClient:
+    """
+    Thin async wrapper around the Google Places web service.
+    Every call takes a token from the shared quota limiter, and the number of
+    requests in flight is bounded so cells and queries can overlap freely.
+    Details and complete search results are served from the response cache when fresh.
+    Transient failures are retried with backoff, and a shared circuit breaker pauses every
+    call while the upstream error rate is too high.
+    """
+
+    def __init__(self, http: httpx.AsyncClient, api_key: str, max_in_flight: int = 20,
+                 limiter: Optional[TokenBucket] = None, cache: Optional[ResponseCache] = None,
+                 retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None):
+        self.http = http
+        self.api_key = api_key
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.limiter = limiter or get_places_limiter()
+        self.cache = cache or get_places_cache()
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or get_places_breaker()
+        # next_page_token -> monotonic time at which Google will accept it
+        self.page_token_ready_at: Dict[str, float] = {}
+
+    async def _request(self, endpoint: str, path: str, params: Dict) -> Dict:
+        """One HTTP call under the quota limiter and in-flight bound, recorded in the metrics"""
+        await self.limiter.acquire()
+        async with self.semaphore:
+            started = time.perf_counter()
+            try:
+                response = await self.http.get(path, params={**params, "key": self.api_key})
+            except Exception as e:
+                places_metrics.record_call(endpoint, type(e).__name__, time.perf_counter() - started, 0)
+                raise
+            latency = time.perf_counter() - started
+        if response.is_error:
+            places_metrics.record_call(endpoint, f"http_{response.status_code}", latency, len(response.content))
+            response.raise_for_status()
+        data = response.json()
+        places_metrics.record_call(endpoint, data.get("status", "UNKNOWN"), latency, len(response.content))
+        return data
+
+    async def _get(self, path: str, params: Dict, run: Optional["QueryRun"] = None) -> Dict:
+        """
+        Call the API, retrying transient failures (OVER_QUERY_LIMIT, 5xx, network errors, and
+        INVALID_REQUEST for a page token that was not ready yet) with jittered exponential
+        backoff. Waits while the circuit breaker is open. After the last retry the final
+        response is returned, or its error raised.
+        """
+        endpoint = path.strip("/").split("/")[0]
+        for attempt in range(self.retry.max_retries + 1):
+            await self.breaker.wait()
+            if run is not None:
+                run.calls += 1
+            data, error, reason = None, None, None
+            try:
+                data = await self._request(endpoint, path, params)
+                status = data.get("status")
+                if status in RETRIABLE_STATUSES or (status == "INVALID_REQUEST" and "pagetoken" in params):
+                    reason = status
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRIABLE_HTTP_STATUSES:
+                    raise
+                error, reason = e, f"http_{e.response.status_code}"
+            except httpx.TransportError as e:
+                error, reason = e, type(e).__name__
+
+            # An early page token is our timing, not an upstream failure
+            if self.breaker.record(failed=reason is not None and reason != "INVALID_REQUEST"):
+                places_metrics.record_breaker_trip()
+                print(f"Places error rate too high, pausing all calls for {self.breaker.cooldown:.0f}s")
+            if reason is None or attempt == self.retry.max_retries:
+                break
+            places_metrics.record_retry(endpoint, reason)
+            delay = self.retry.delay(attempt + 1)
+            if reason == "INVALID_REQUEST":
+                delay = max(delay, PAGE_TOKEN_DELAY / 2)
+            await asyncio.sleep(delay)
+
+        if error is not None:
+            raise error
+        return data
+
+    async def cached(self, key: str) -> Optional[Dict]:
+        """Fresh cached payload for a request, if any. SQLite I/O runs in a worker thread, off the crawl's event loop"""
+        if not self.cache:
+            return None
+        return await asyncio.to_thread(self.cache.get, key)
+
+    async def store(self, key: str, data: Dict):
+        if self.cache:
+            await asyncio.to_thread(self.cache.set, key, data)
+
+    async def text_search(self, query: str, lat: float, lng: float, page_token: Optional[str] = None,
+                          radius: int = SEARCH_RADIUS, run: Optional["QueryRun"] = None) -> Dict:
+        params = {"query": query, "location": f"{lat},{lng}", "radius": radius}
+        if page_token:
+            # Only this query waits for its token; everything else keeps running
+            ready_at = self.page_token_ready_at.pop(page_token, 0.0)
+            delay = ready_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            params["pagetoken"] = page_token
+        data = await self._get("/textsearch/json", params, run)
+        if data.get("next_page_token"):
+            self.page_token_ready_at[data["next_page_token"]] = time.monotonic() + PAGE_TOKEN_DELAY
+        return data
+
+    async def nearby_search(self, lat: float, lng: float, radius: int = SEARCH_RADIUS, run: Optional["QueryRun"] = None) -> Dict:
+        params = {"location": f"{lat},{lng}", "radius": radius, "type": "restaurant"}
+        key = request_signature("nearbysearch", params)
+        cached = await self.cached(key)
+        if cached is not None:
+            places_metrics.record_cache_hit("nearbysearch")
+            return cached
+        data = await self._get("/nearbysearch/json", params, run)
+        if data.get("status") in ("OK", "ZERO_RESULTS"):
+            await self.store(key, data)
+        return data
+
+    async def details(self, place_id: str, fields: str) -> Dict:
+        key = f"details:{place_id}:{fields}"
+        cached = await self.cached(key)
+        if cached is not None:
+            places_metrics.record_cache_hit("details")
+            return cached
+        data = await self._get("/details/json", {"place_id": place_id, "fields": fields})
+        if data.get("status") == "OK":
+            await self.store(key, data)
+        return data
+
+NEARBY_QUERY = "nearby"
+
+def query_label(template: str) -> str:
+    """Short name of a search template, e.g. "fast food" """
+    return template.split(" near ")[0]
+
+QUERY_LABELS = [query_label(template) for template in SEARCH_QUERIES] + [NEARBY_QUERY]
+
+@dataclass
+class QueryRun:
+    """Results of one search query for a cell"""
+    label: str
+    results: List[Dict]
+    calls: int = 0  # API calls made (counted by PlacesClient); 0 when served from the cache
+    error: Optional[str] = None  # set when the query failed after retries, so its results are incomplete
+    error_class: Optional[str] = None  # see app.crawler.retry.classify_error
+
+class PlacesQueryError(Exception):
+    """A cell's search queries did not all complete, so the cell must not be marked completed"""
+
+    def __init__(self, message: str, api_calls: int = 0, error_class: Optional[str] = None):
+        super().__init__(message)
+        self.api_calls = api_calls
+        self.error_class = error_class
+
+@dataclass
+class LocationResults:
+    """Unique restaurants found for one cell"""
+    results: List[Dict]
+    saturated: bool = False  # a query hit Google's result cap, so the cell has more places than we saw
+    found_by: Dict[str, str] = field(default_factory=dict)  # place_id -> label of the first query that found it
+    query_stats: Dict[str, Dict[str, int]] = field(default_factory=dict)  # label -> calls, results, new_places
+    skipped_queries: List[str] = field(default_factory=list)  # low-yield queries not run for this cell
+
+    @property
+    def api_calls(self) -> int:
+        """Places calls actually made for the cell (cache hits cost none)"""
+        return sum(stats["calls"] for stats in self.query_stats.values())
+
+async def run_text_query(client: PlacesClient, lat: float, lng: float, query: str, radius: int = SEARCH_RADIUS,
+                         known_place_ids: Optional[Set[str]] = None) -> QueryRun:
+    """
+    Run one text search query and follow its next_page_tokens, returning every page's results.
+    With `known_place_ids`, paging stops after a page that contains no place_id outside it.
+    """
+    run = QueryRun(query_label(query), [])
+    # Page tokens expire, so the cache holds a query's complete result set rather than single pages
+    cache_key = request_signature("textsearch", {"query": query, "location": f"{lat},{lng}", "radius": radius})
+    cached = await client.cached(cache_key)
+    if cached is not None:
+        places_metrics.record_cache_hit("textsearch")
+        run.results = cached["results"]
+        return run
+
+    next_page_token = None
+    page = 0
+    complete = False
+
+    while True:
+        try:
+            data = await client.text_search(query, lat, lng, next_page_token, radius=radius, run=run)
+        except Exception as e:
+            print(f"    Error making API call for '{query}': {str(e)}")
+            run.error = f"'{query}' page {page + 1}: {str(e)}"
+            run.error_class = classify_error(e)
+            break
+
+        page += 1
+        if data.get("status") != "OK":
+            if data.get("status") != "ZERO_RESULTS":
+                print(f"    API error for '{query}': {data.get('status')} - {data.get('error_message', 'Unknown error')}")
+                run.error = f"'{query}' page {page}: {data.get('status')}"
+                run.error_class = status_error_class(data.get("status"))
+            else:
+                complete = True
+            break
+
+        page_results = data.get("results", [])
+        run.results.extend(page_results)
+        print(f"    '{query}' page {page}: Found {len(page_results)} restaurants")
+
+        # Check if there are more pages; the client waits until the token is ready
+        next_page_token = data.get("next_page_token")
+        if not next_page_token:
+            complete = True
+            break
+        if known_place_ids is not None and all(r.get("place_id") in known_place_ids for r in page_results):
+            print(f"    '{query}' page {page}: nothing new, not paging further")
+            break
+
+    if complete:
+        await client.store(cache_key, {"results": run.results})
+    return run
+
+async def get_restaurants_with_nearby_search(client: PlacesClient, lat: float, lng: float, radius: int = SEARCH_RADIUS) -> QueryRun:
+    """
+    Alternative method using Google Maps Nearby Search API.
+    Sometimes returns different/more results than Text Search.
+    """
+    run = QueryRun(NEARBY_QUERY, [])
+    try:
+        data = await client.nearby_search(lat, lng, radius=radius, run=run)
+    except Exception as e:
+        print(f"  Nearby Search error: {str(e)}")
+        run.error = f"Nearby Search: {str(e)}"
+        run.error_class = classify_error(e)
+        return run
+
+    if data.get("status") != "OK":
+        if data.get("status") != "ZERO_RESULTS":
+            print(f"  Nearby Search API error: {data.get('status')}")
+            run.error = f"Nearby Search: {data.get('status')}"
+            run.error_class = status_error_class(data.get("status"))
+        return run
+
+    run.results = data.get("results", [])
+    return run
+
+async def get_all_restaurants_for_location(client: PlacesClient, lat: float, lng: float, radius: int = SEARCH_RADIUS,
+                                           known_place_ids: Optional[Set[str]] = None,
+                                           planner: Optional[QueryPlanner] = None, depth: int = 0) -> LocationResults:
+    """
+    Get all restaurants for a location using Google Maps API pagination.
+    Runs the search queries the planner picks for this area, plus a Nearby Search when it
+    is picked, concurrently and merges them best query first, keeping only the first
+    occurrence of each place_id. Each query's marginal yield is fed back to the planner.
+    `known_place_ids` (place_ids found by earlier cells) is only read, never updated here.
+    Queries also stop paging once a page brings nothing new, unless pruning is off or the
+    cell was split off a dense one (`depth` > 0): a child's first pages are mostly places
+    its parent found, and stopping there would hide that the child is saturated too.
+    """
+    planner = planner or get_query_planner(QUERY_LABELS)
+    labels, skipped = planner.plan(lat, lng)
+    stop_paging_at = known_place_ids if planner.enabled and depth == 0 else None
+    templates = {query_label(template): template for template in SEARCH_QUERIES}
+    runs = await asyncio.gather(*(
+        get_restaurants_with_nearby_search(client, lat, lng, radius) if label == NEARBY_QUERY
+        else run_text_query(client, lat, lng, templates[label].format(lat=lat, lng=lng), radius, stop_paging_at)
+        for label in labels
+    ))
+    failed = [run for run in runs if run.error]
+    if failed:
+        # Complete queries are in the response cache, so the retry pass only pays for the failed ones
+        raise PlacesQueryError("; ".join(run.error for run in failed), sum(run.calls for run in runs),
+                               failed[0].error_class)
+    saturated = any(len(run.results) >= RESULT_CAP for run in runs if run.label != NEARBY_QUERY)
+
+    all_results = []
+    found_by = {}  # Track unique restaurants by place_id
+    query_stats = {}
+    for run in runs:
+        new_places = 0
+        for restaurant in run.results:
+            place_id = restaurant.get("place_id")
+            if place_id and place_id not in found_by:
+                found_by[place_id] = run.label
+                all_results.append(restaurant)
+                if known_place_ids is None or place_id not in known_place_ids:
+                    new_places += 1
+        query_stats[run.label] = {"calls": run.calls, "results": len(run.results), "new_places": new_places}
+        planner.record(lat, lng, run.label, run.calls, len(run.results), new_places)
+
+    print(f"  Final total at {lat},{lng}: {len(all_results)} unique restaurants found"
+          + (f" (skipped {', '.join(skipped)})" if skipped else ""))
+    return LocationResults(all_results, saturated, found_by, query_stats, skipped)
@@ -0,0 +1,119 @@
+import math
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+QUERY_PRUNING_ENABLED = os.getenv("QUERY_PRUNING_ENABLED", "true").lower() == "true"
+QUERY_MIN_YIELD = float(os.getenv("QUERY_MIN_YIELD", "1"))  # new place_ids per API call below which a query is skipped
+QUERY_MIN_SAMPLES = int(os.getenv("QUERY_MIN_SAMPLES", "4"))  # cells of evidence before a query can be skipped
+QUERY_EXPLORE_EVERY = int(os.getenv("QUERY_EXPLORE_EVERY", "8"))  # still run every query on every Nth cell of an area
+QUERY_AREA_SIZE = 0.04  # degrees per side of the areas yields are tracked for (two coarse cells)
+
+@dataclass
+class QueryStats:
+    """What one search query has cost and found so far"""
+    cells: int = 0
+    calls: int = 0
+    results: int = 0
+    new_places: int = 0  # place_ids no earlier-ranked query of the cell, nor any earlier cell, had found
+    skipped: int = 0
+
+    @property
+    def yield_per_call(self) -> Optional[float]:
+        return self.new_places / self.calls if self.calls > 0 else None
+
+    def as_dict(self) -> Dict:
+        per_call = self.yield_per_call
+        return {"cells": self.cells, "calls": self.calls, "results": self.results, "new_places": self.new_places,
+                "skipped": self.skipped, "new_per_call": round(per_call, 3) if per_call is not None else None}
+
+class QueryPlanner:
+    """
+    Decides which search queries to run for a cell from the marginal yield each query has
+    had in the same area (falling back to the whole crawl while an area is new).
+    Queries are ranked by yield, and those yielding under `min_yield` new place_ids per
+    call are skipped, except on every `explore_every`-th cell of an area so their
+    numbers stay current. The first query is the broadest and always runs.
+    """
+
+    def __init__(self, labels: List[str], enabled: bool = QUERY_PRUNING_ENABLED, min_yield: float = QUERY_MIN_YIELD,
+                 min_samples: int = QUERY_MIN_SAMPLES, explore_every: int = QUERY_EXPLORE_EVERY,
+                 area_size: float = QUERY_AREA_SIZE):
+        self.labels = labels
+        self.enabled = enabled
+        self.min_yield = min_yield
+        self.min_samples = min_samples
+        self.explore_every = explore_every
+        self.area_size = area_size
+        self.lock = threading.Lock()
+        self.areas: Dict[Tuple[int, int], Dict[str, QueryStats]] = {}
+        self.totals = {label: QueryStats() for label in labels}
+        self.planned = Counter()
+
+    def _area(self, lat: float, lng: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.area_size)), int(math.floor(lng / self.area_size))
+
+    def _evidence(self, area: Dict[str, QueryStats], label: str) -> Optional[QueryStats]:
+        for stats in (area.get(label), self.totals[label]):
+            if stats is not None and stats.cells >= self.min_samples and stats.calls > 0:
+                return stats
+        return None
+
+    def plan(self, lat: float, lng: float) -> Tuple[List[str], List[str]]:
+        """(queries to run, best first; queries skipped) for a cell"""
+        with self.lock:
+            key = self._area(lat, lng)
+            area = self.areas.setdefault(key, {})
+            self.planned[key] += 1
+            if not self.enabled:
+                return list(self.labels), []
+
+            evidence = {label: self._evidence(area, label) for label in self.labels}
+            primary, rest = self.labels[0], self.labels[1:]
+            # Unproven queries first (they may be good), then by yield
+            rest = sorted(rest, key=lambda label: -(evidence[label].yield_per_call if evidence[label] else math.inf))
+            explore = self.planned[key] % self.explore_every == 0
+            run, skipped = [primary], []
+            for label in rest:
+                stats = evidence[label]
+                if explore or stats is None or stats.yield_per_call >= self.min_yield:
+                    run.append(label)
+                else:
+                    skipped.append(label)
+                    area.setdefault(label, QueryStats()).skipped += 1
+                    self.totals[label].skipped += 1
+            return run, skipped
+
+    def record(self, lat: float, lng: float, label: str, calls: int, results: int, new_places: int):
+        """Add one cell's run of a query. Runs served from the response cache cost no calls and are not counted."""
+        if calls == 0:
+            return
+        with self.lock:
+            area = self.areas.setdefault(self._area(lat, lng), {})
+            for stats in (area.setdefault(label, QueryStats()), self.totals[label]):
+                stats.cells += 1
+                stats.calls += calls
+                stats.results += results
+                stats.new_places += new_places
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "min_yield": self.min_yield,
+                "areas": len(self.areas),
+                "queries": {label: stats.as_dict() for label, stats in self.totals.items()},
+            }
+
+_query_planner: Optional[QueryPlanner] = None
+_query_planner_lock = threading.Lock()
+
+def get_query_planner(labels: List[str]) -> QueryPlanner:
+    """Process-wide planner, so what one crawl learns carries over to the next"""
+    global _query_planner
+    with _query_planner_lock:
+        if _query_planner is None:
+            _query_planner = QueryPlanner(labels)
+        return _query_planner
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+# Quota configuration, e.g. PLACES_QPS=10 or PLACES_QPM=600 (the stricter of the two wins)
+PLACES_QPS = os.getenv("PLACES_QPS", "10")
+PLACES_QPM = os.getenv("PLACES_QPM")
+PLACES_BURST = os.getenv("PLACES_BURST")
+# "memory" for a per-process bucket, "postgres" to share one bucket across processes
+PLACES_RATE_LIMIT_BACKEND = os.getenv("PLACES_RATE_LIMIT_BACKEND", "memory")
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    Callers reserve a token and are told how long to wait for it, so the same bucket
+    can be shared by several event loops and plain threads in one process.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """Take `cost` tokens and return the number of seconds to wait before using them"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            # Tokens may go negative: that debt is the queue of callers already waiting
+            self.tokens -= cost
+            return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self, cost: float = 1.0):
+        delay = self.reserve(cost)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self, cost: float = 1.0):
+        delay = self.reserve(cost)
+        if delay > 0:
+            time.sleep(delay)
+
+class PostgresTokenBucket(TokenBucket):
+    """
+    Token bucket stored in the rate_limit_buckets table so every process and machine
+    crawling with the same database shares one quota. The refill and take happen in a
+    single upsert, so the row lock is held only for that statement.
+    """
+
+    RESERVE_SQL = text("""
+        INSERT INTO rate_limit_buckets (name, tokens, updated_at)
+        VALUES (:name, :capacity - :cost, clock_timestamp())
+        ON CONFLICT (name) DO UPDATE SET
+            tokens = LEAST(
+                :capacity,
+                rate_limit_buckets.tokens
+                + EXTRACT(EPOCH FROM clock_timestamp() - rate_limit_buckets.updated_at) * :rate
+            ) - :cost,
+            updated_at = clock_timestamp()
+        RETURNING tokens
+    """)
+
+    def __init__(self, engine, name: str, rate: float, capacity: Optional[float] = None):
+        super().__init__(rate, capacity)
+        self.engine = engine
+        self.name = name
+
+    def reserve(self, cost: float = 1.0) -> float:
+        with self.engine.begin() as connection:
+            tokens = connection.execute(self.RESERVE_SQL, {
+                "name": self.name,
+                "capacity": self.capacity,
+                "rate": self.rate,
+                "cost": cost,
+            }).scalar()
+        return max(0.0, -tokens / self.rate)
+
+    async def acquire(self, cost: float = 1.0):
+        # Keep the database round-trip off the event loop
+        delay = await asyncio.to_thread(self.reserve, cost)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+_places_limiter: Optional[TokenBucket] = None
+_places_limiter_lock = threading.Lock()
+
+def places_rate() -> float:
+    """Requests per second allowed by the configured QPS/QPM quota"""
+    rate = float(PLACES_QPS)
+    if PLACES_QPM:
+        rate = min(rate, float(PLACES_QPM) / 60)
+    return rate
+
+def get_places_limiter() -> TokenBucket:
+    """Process-wide limiter that every Google Places call goes through"""
+    global _places_limiter
+    with _places_limiter_lock:
+        if _places_limiter is None:
+            rate = places_rate()
+            capacity = float(PLACES_BURST) if PLACES_BURST else None
+            if PLACES_RATE_LIMIT_BACKEND == "postgres":
+                from app.database.connection import engine
+                _places_limiter = PostgresTokenBucket(engine, "google_places", rate, capacity)
+            else:
+                _places_limiter = TokenBucket(rate, capacity)
+        return _places_limiter
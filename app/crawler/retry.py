@@ -0,0 +1,123 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import httpx
+
+PLACES_MAX_RETRIES = int(os.getenv("PLACES_MAX_RETRIES", "4"))
+PLACES_BACKOFF_BASE = float(os.getenv("PLACES_BACKOFF_BASE", "0.5"))  # seconds before the first retry
+PLACES_BACKOFF_MAX = float(os.getenv("PLACES_BACKOFF_MAX", "30"))
+PLACES_BREAKER_ERROR_RATE = float(os.getenv("PLACES_BREAKER_ERROR_RATE", "0.5"))
+PLACES_BREAKER_MIN_CALLS = int(os.getenv("PLACES_BREAKER_MIN_CALLS", "20"))
+PLACES_BREAKER_WINDOW = float(os.getenv("PLACES_BREAKER_WINDOW", "30"))  # seconds of outcomes the error rate is taken over
+PLACES_BREAKER_COOLDOWN = float(os.getenv("PLACES_BREAKER_COOLDOWN", "30"))
+
+# Failed cells wait CRAWL_RETRY_BASE_SECONDS * 2**(retry_count - 1), at most CRAWL_RETRY_MAX_SECONDS
+CRAWL_RETRY_BASE_SECONDS = float(os.getenv("CRAWL_RETRY_BASE_SECONDS", "60"))
+CRAWL_RETRY_MAX_SECONDS = float(os.getenv("CRAWL_RETRY_MAX_SECONDS", "3600"))
+
+# Google statuses worth another try; INVALID_REQUEST is only retried for page tokens that were not ready yet
+RETRIABLE_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+RETRIABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_retries: int = PLACES_MAX_RETRIES, base_delay: float = PLACES_BACKOFF_BASE,
+                 max_delay: float = PLACES_BACKOFF_MAX):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, retry: int) -> float:
+        """Seconds to wait before retry number `retry` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+class CircuitBreaker:
+    """
+    Opens when at least `error_rate` of the calls in the last `window` seconds failed
+    (given at least `min_calls` of them), and keeps every caller waiting for `cooldown`
+    seconds before letting calls through again. Shared by all crawls in the process, so a
+    failing upstream pauses the crawler instead of burning through cells.
+    """
+
+    def __init__(self, error_rate: float = PLACES_BREAKER_ERROR_RATE, min_calls: int = PLACES_BREAKER_MIN_CALLS,
+                 window: float = PLACES_BREAKER_WINDOW, cooldown: float = PLACES_BREAKER_COOLDOWN):
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.outcomes = deque()  # (monotonic time, failed)
+        self.failures = 0
+        self.open_until = 0.0
+        self.trips = 0
+
+    def record(self, failed: bool) -> bool:
+        """Record a call's outcome; True if this outcome opened the breaker"""
+        now = time.monotonic()
+        with self.lock:
+            self.outcomes.append((now, failed))
+            self.failures += failed
+            while self.outcomes and self.outcomes[0][0] < now - self.window:
+                self.failures -= self.outcomes.popleft()[1]
+            if now < self.open_until or len(self.outcomes) < self.min_calls:
+                return False
+            if self.failures / len(self.outcomes) >= self.error_rate:
+                self.open_until = now + self.cooldown
+                self.outcomes.clear()
+                self.failures = 0
+                self.trips += 1
+                return True
+            return False
+
+    def remaining(self) -> float:
+        """Seconds until the breaker closes; 0 when it is closed"""
+        return max(0.0, self.open_until - time.monotonic())
+
+    async def wait(self):
+        delay = self.remaining()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.remaining()
+
+def status_error_class(status: str) -> str:
+    """Error class of a non-OK Google status"""
+    if status == "OVER_QUERY_LIMIT":
+        return "quota"
+    if status == "UNKNOWN_ERROR":
+        return "upstream"
+    return "other"
+
+def classify_error(error: Exception) -> str:
+    """
+    Error class of a failed cell, which orders the retry queue: network blips and upstream
+    5xx usually clear up first, quota errors once the quota refills, anything else last.
+    """
+    if getattr(error, "error_class", None):
+        return error.error_class
+    if isinstance(error, httpx.TransportError):
+        return "network"
+    if isinstance(error, httpx.HTTPStatusError):
+        return "quota" if error.response.status_code == 429 else "upstream"
+    return "other"
+
+def next_retry_delay(retry_count: int) -> float:
+    """Seconds a cell that has failed `retry_count` times waits before it is retried, with jitter"""
+    delay = min(CRAWL_RETRY_MAX_SECONDS, CRAWL_RETRY_BASE_SECONDS * 2 ** max(retry_count - 1, 0))
+    return delay * random.uniform(0.8, 1.2)
+
+_places_breaker: Optional[CircuitBreaker] = None
+_places_breaker_lock = threading.Lock()
+
+def get_places_breaker() -> CircuitBreaker:
+    """Process-wide circuit breaker for Google Places calls"""
+    global _places_breaker
+    with _places_breaker_lock:
+        if _places_breaker is None:
+            _places_breaker = CircuitBreaker()
+        return _places_breaker
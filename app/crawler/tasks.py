@@ -0,0 +1,435 @@
+import asyncio
+import json
+import os
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy import or_, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.crawler.details import DETAILS_FIELDS, HEAVY_DETAILS_FIELDS, build_restaurant_data, merge_heavy_fields
+from app.crawler.engine import DEFAULT_CONCURRENCY, crawl_cells, fetch_place_details
+from app.crawler.grid import insert_cells, should_split, split_cell
+from app.crawler.places import SEARCH_RADIUS, PlacesQueryError
+from app.crawler.jobs import JobProgress, job_handler
+from app.crawler.leases import claimed_cells, new_worker_id, release_lease
+from app.crawler.retry import classify_error, next_retry_delay
+from app.database.connection import engine
+from app.models.data_collection import data_collection_api_calls
+from app.models.discovered_place import DiscoveredPlace
+from app.models.restaurant import Restaurant
+from app.database.upsert import RestaurantWriter
+import app.database.read_cache  # noqa: F401 - invalidates cached restaurant reads when they change
+
+# How much of each cell's raw search payload to keep: "compressed" (zlib JSON in
+# response_body_gz), "json" (response_body, as before) or "none". discovered_places is
+# always written and is what the details pass and yield tracking read.
+CRAWL_RAW_RESPONSES = os.getenv("CRAWL_RAW_RESPONSES", "compressed").lower()
+
+def store_raw_response(record: data_collection_api_calls, results):
+    payload = {"results": results}
+    if CRAWL_RAW_RESPONSES == "json":
+        record.response_body = payload
+    elif CRAWL_RAW_RESPONSES == "compressed":
+        record.response_body_gz = zlib.compress(json.dumps(payload).encode("utf-8"))
+
+def record_discovered_places(db: Session, cell_id: int, found_by: Dict[str, str]):
+    """Link every place_id a cell returned to that cell. Does not commit."""
+    if not found_by:
+        return
+    rows = [{"cell_id": cell_id, "place_id": place_id, "query": query} for place_id, query in found_by.items()]
+    db.execute(insert(DiscoveredPlace).values(rows).on_conflict_do_nothing())
+
+async def crawl_and_save(records, worker_id: str, api_key: str, db: Session, concurrency: int, commit_every: int,
+                         retry: bool = False, progress: Optional[JobProgress] = None,
+                         seen_place_ids: Optional[Set[str]] = None) -> Dict[str, int]:
+    """
+    Crawl the given records with the async engine and write each result back as it completes.
+    `records` may be a generator (e.g. leases.claimed_cells); it is consumed lazily.
+    They are leased to `worker_id`: a cell whose lease another worker has taken over in
+    the meantime is left as that worker will write it.
+    Commits every `commit_every` results so progress survives a crash mid-run.
+    Dense cells are split into four pending child cells (see app.crawler.grid.should_split);
+    `seen_place_ids` carries the place_ids already found so each cell's new-place yield is known.
+    """
+    records_by_id = {}
+    seen_place_ids = seen_place_ids if seen_place_ids is not None else set()
+    summary = {"processed": 0, "errors": 0, "restaurants": 0, "cells_split": 0, "queries_skipped": 0, "leases_lost": 0}
+    since_commit = 0
+
+    def cells():
+        for record in records:
+            records_by_id[record.id] = record
+            yield (record.id, record.latitude, record.longitude, record.radius or SEARCH_RADIUS, record.depth or 0)
+
+    async for cell_id, location_results, error in crawl_cells(cells(), api_key, concurrency=concurrency,
+                                                               known_place_ids=seen_place_ids):
+        record = records_by_id.pop(cell_id)
+        api_calls = 0
+
+        if not release_lease(db, record, worker_id):
+            print(f"Lease on cell {record.id} was taken over by another worker, dropping its result")
+            summary["leases_lost"] += 1
+            if progress:
+                spent = location_results.api_calls if error is None else getattr(error, "api_calls", 0)
+                progress.advance(api_calls=spent)
+            continue
+
+        if error is not None:
+            record.status = "error"
+            if retry:
+                record.error_message = f"Retry failed: {str(error)}"
+            elif isinstance(error, (httpx.HTTPError, PlacesQueryError)):
+                record.error_message = f"API request failed: {str(error)}"
+            else:
+                record.error_message = f"Processing error: {str(error)}"
+            record.retry_count += 1
+            record.error_class = classify_error(error)
+            record.next_retry_at = datetime.now(timezone.utc) + timedelta(seconds=next_retry_delay(record.retry_count))
+            api_calls = getattr(error, "api_calls", 0)
+            record.api_calls_made = (record.api_calls_made or 0) + api_calls
+            summary["errors"] += 1
+        else:
+            all_restaurants_for_location = location_results.results
+            new_place_ids = {r["place_id"] for r in all_restaurants_for_location} - seen_place_ids
+            seen_place_ids.update(new_place_ids)
+
+            # Update the record with response data
+            record.status = "completed"
+            record.processed_at = datetime.now()
+            store_raw_response(record, all_restaurants_for_location)
+            record_discovered_places(db, record.id, location_results.found_by)
+            api_calls = location_results.api_calls
+            record.api_calls_made = (record.api_calls_made or 0) + api_calls if retry else api_calls
+            record.restaurants_found = len(all_restaurants_for_location)
+            record.new_places_found = len(new_place_ids)
+            if retry:
+                record.error_message = None  # Clear previous error
+                record.error_class = None
+                record.next_retry_at = None
+            summary["processed"] += 1
+            summary["restaurants"] += len(all_restaurants_for_location)
+            summary["queries_skipped"] += len(location_results.skipped_queries)
+            print(f"Found {len(all_restaurants_for_location)} restaurants ({len(new_place_ids)} new) at location {record.latitude},{record.longitude}")
+
+            if record.cell_size and should_split(record.depth or 0, location_results.saturated, len(new_place_ids)):
+                children = split_cell(record.latitude, record.longitude, record.cell_size, record.depth or 0)
+                insert_cells(db, [{"parent_id": record.id, **child} for child in children])
+                summary["cells_split"] += 1
+                if progress:
+                    progress.total += len(children)
+                print(f"Split cell {record.id} at depth {record.depth} into 4 children")
+
+        if progress:
+            progress.advance(processed=1 if error is None else 0, errors=1 if error is not None else 0, api_calls=api_calls)
+
+        since_commit += 1
+        if since_commit >= commit_every:
+            db.commit()
+            since_commit = 0
+
+    db.commit()
+    return summary
+
+# Every place_id found by a completed cell that has no restaurants row yet, once each,
+# with the first cell that found it. The anti-join runs against restaurants.place_id's unique index.
+PENDING_DETAILS_SQL = text("""
+    SELECT DISTINCT ON (found.place_id)
+        found.place_id, cells.id, cells.latitude, cells.longitude
+    FROM discovered_places AS found
+    JOIN data_collection_api_calls AS cells ON cells.id = found.cell_id
+    WHERE cells.status = 'completed'
+      AND NOT EXISTS (SELECT 1 FROM restaurants WHERE restaurants.place_id = found.place_id)
+    ORDER BY found.place_id, found.first_seen, cells.id
+""")
+
+PENDING_DETAILS_COUNT_SQL = text(f"SELECT count(*) FROM ({PENDING_DETAILS_SQL.text}) AS pending")
+
+def iter_pending_details(db: Session, yield_per: int = 1000) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream (place_id, source cell) for every discovered place_id that is not in the
+    restaurants table yet, through a server-side cursor on a separate connection, so
+    the session can keep committing while the rows are read `yield_per` at a time.
+    """
+    with db.get_bind().connect() as connection:
+        result = connection.execution_options(yield_per=yield_per).execute(PENDING_DETAILS_SQL)
+        for place_id, record_id, latitude, longitude in result:
+            yield place_id, {"latitude": latitude, "longitude": longitude, "record_id": record_id}
+
+async def fetch_and_save_details(pending: Iterable[Tuple[str, Dict[str, Any]]], api_key: str, db: Session,
+                                 concurrency: int, progress: Optional[JobProgress] = None,
+                                 chunk_size: int = 200) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch details for the pending (place_id, source) pairs concurrently and upsert the
+    restaurants in chunks as they arrive. `pending` is consumed lazily, so only the places
+    in flight and the current chunk are held in memory.
+    Yields one entry per place: the saved restaurant's detailed info, or its error.
+    """
+    writer = RestaurantWriter(db, chunk_size=chunk_size)
+    sources = {}
+
+    def place_ids():
+        for place_id, source in pending:
+            sources[place_id] = source
+            yield place_id
+
+    def failed(place_id, error):
+        if progress:
+            progress.advance(errors=1)
+        return {"place_id": place_id, "source_location": sources.pop(place_id, None), "error": error}
+
+    def saved_restaurants(results):
+        for result in results:
+            place_id, restaurant_details, source = result.context
+            if result.error is not None:
+                print(f"Database error saving restaurant {restaurant_details.get('name')}: {result.error}")
+                if progress:
+                    progress.advance(errors=1)
+                yield {"place_id": place_id, "source_location": source, "error": result.error}
+                continue
+            if progress:
+                progress.advance(processed=1)
+            yield {
+                "place_id": place_id,
+                "name": restaurant_details.get("name"),
+                "detailed_info": restaurant_details,
+                "source_location": source,
+                "database_id": result.id
+            }
+
+    async for place_id, details_data, error in fetch_place_details(place_ids(), api_key, DETAILS_FIELDS, concurrency):
+        if error is not None:
+            print(f"Request error for place_id {place_id}: {str(error)}")
+            yield failed(place_id, f"Request error: {str(error)}")
+            continue
+
+        if progress:
+            progress.advance(api_calls=1)
+        if details_data.get("status") != "OK":
+            print(f"API error for place_id {place_id}: {details_data.get('status')}")
+            yield failed(place_id, f"API error: {details_data.get('status')}")
+            continue
+
+        restaurant_details = details_data.get("result", {})
+        restaurant_data = build_restaurant_data(place_id, restaurant_details)
+        context = (place_id, restaurant_details, sources.pop(place_id))
+        for saved in saved_restaurants(writer.add(restaurant_data, context=context)):
+            yield saved
+
+    for saved in saved_restaurants(writer.flush()):
+        yield saved
+    print(f"Saved {writer.written} restaurants ({writer.failed} failed)")
+
+def stream_restaurant_details(api_key: str, concurrency: int, include_details: bool = False) -> Iterator[str]:
+    """
+    Run the details pass in its own session and event loop, yielding one NDJSON line per
+    processed restaurant and a final summary line. Starlette iterates sync generators in
+    its threadpool, so the blocking database work stays off the server's event loop.
+    """
+    loop = asyncio.new_event_loop()
+    summary = {"summary": True, "saved": 0, "errors": 0}
+    with Session(engine) as db:
+        entries = fetch_and_save_details(iter_pending_details(db), api_key, db, concurrency)
+        try:
+            while True:
+                try:
+                    entry = loop.run_until_complete(entries.__anext__())
+                except StopAsyncIteration:
+                    break
+                if entry.get("error") is not None:
+                    summary["errors"] += 1
+                else:
+                    summary["saved"] += 1
+                    if not include_details:
+                        entry = {key: value for key, value in entry.items() if key != "detailed_info"}
+                yield json.dumps(entry) + "\n"
+        finally:
+            loop.run_until_complete(entries.aclose())
+            loop.close()
+    yield json.dumps(summary) + "\n"
+
+async def hydrate_restaurants(place_ids: Iterable[str], api_key: str, db: Session, concurrency: int,
+                              progress: Optional[JobProgress] = None, commit_every: int = 100) -> Dict[str, int]:
+    """
+    Fetch the heavy Place Details fields (reviews, photos) for the given restaurants and
+    merge them into scraped_json. `place_ids` is consumed lazily.
+    """
+    summary = {"hydrated": 0, "errors": 0}
+    since_commit = 0
+    async for place_id, details_data, error in fetch_place_details(place_ids, api_key, HEAVY_DETAILS_FIELDS, concurrency):
+        if error is None and details_data.get("status") != "OK":
+            error = f"API error: {details_data.get('status')}"
+        if error is not None:
+            print(f"Hydration failed for place_id {place_id}: {str(error)}")
+            summary["errors"] += 1
+            if progress:
+                progress.advance(errors=1, api_calls=1 if details_data else 0)
+            continue
+
+        restaurant = db.query(Restaurant).filter(Restaurant.place_id == place_id).first()
+        if restaurant is not None:
+            merge_heavy_fields(restaurant, details_data.get("result", {}))
+        summary["hydrated"] += 1
+        if progress:
+            progress.advance(processed=1, api_calls=1)
+
+        since_commit += 1
+        if since_commit >= commit_every:
+            db.commit()
+            since_commit = 0
+
+    db.commit()
+    return summary
+
+def hydrate_restaurant(db: Session, restaurant: Restaurant, api_key: str) -> bool:
+    """On-demand hydration of a single restaurant, e.g. when it is viewed"""
+    summary = asyncio.run(hydrate_restaurants([restaurant.place_id], api_key, db, concurrency=1))
+    db.refresh(restaurant)
+    return summary["hydrated"] == 1
+
+def google_maps_api_key() -> str:
+    """The API key is read from the environment and never stored with the job"""
+    api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+    if not api_key:
+        raise RuntimeError("Google Maps API key not configured")
+    return api_key
+
+KNOWN_PLACE_IDS_SQL = text("""
+    SELECT DISTINCT found.place_id
+    FROM discovered_places AS found
+    JOIN data_collection_api_calls AS cells ON cells.id = found.cell_id
+    WHERE cells.status = 'completed'
+""")
+
+def _known_place_ids(db: Session) -> Set[str]:
+    """place_ids already found by completed cells, so re-runs measure yield against them"""
+    return {place_id for (place_id,) in db.execute(KNOWN_PLACE_IDS_SQL) if place_id}
+
+@job_handler("process_locations")
+def process_locations_job(db: Session, params: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """
+    Crawl every pending grid cell. Cells are leased in small batches, so several workers
+    (threads, processes or machines) can share the grid without crawling a cell twice.
+    Children created by splitting dense cells are pending: the cells are crawled in rounds
+    until a round finds nothing left to claim, so children split off near the end of a
+    round, when the claiming generator has already run dry, are crawled by the next one.
+    """
+    api_key = google_maps_api_key()
+    seen_place_ids = _known_place_ids(db)
+    concurrency = params.get("concurrency", DEFAULT_CONCURRENCY)
+    progress.set_total(db.query(data_collection_api_calls).filter(
+        data_collection_api_calls.status == "pending"
+    ).count())
+
+    worker_id = new_worker_id()
+    summary = Counter()
+    while True:
+        records = claimed_cells(db, worker_id, "pending", batch_size=concurrency * 2)
+        crawled = asyncio.run(crawl_and_save(
+            records, worker_id, api_key, db, concurrency, params.get("batch_size", 20),
+            progress=progress, seen_place_ids=seen_place_ids
+        ))
+        summary.update(crawled)
+        if crawled["processed"] + crawled["errors"] + crawled["leases_lost"] == 0:
+            break
+    return {
+        "total_records": summary["processed"] + summary["errors"],
+        "processed_successfully": summary["processed"],
+        "errors": summary["errors"],
+        "cells_split": summary["cells_split"],
+        "queries_skipped": summary["queries_skipped"],
+        "leases_lost": summary["leases_lost"],
+        "total_restaurants_found": summary["restaurants"],
+        "unique_restaurants_found": len(seen_place_ids),
+        "average_restaurants_per_location": summary["restaurants"] / summary["processed"] if summary["processed"] > 0 else 0
+    }
+
+@job_handler("retry_failed")
+def retry_failed_job(db: Session, params: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """
+    Drain the retry queue: failed cells with retries left whose next_retry_at has passed
+    (every one of them with `force`), best candidates first, concurrently under the
+    shared quota. Cells that fail again are rescheduled with a longer delay.
+    """
+    api_key = google_maps_api_key()
+    concurrency = params.get("concurrency", DEFAULT_CONCURRENCY)
+    due_only = not params.get("force", False)
+    started = db.execute(text("SELECT now()")).scalar()
+    query = db.query(data_collection_api_calls).filter(
+        data_collection_api_calls.status == "error",
+        data_collection_api_calls.retry_count < data_collection_api_calls.max_retries
+    )
+    if due_only:
+        query = query.filter(or_(data_collection_api_calls.next_retry_at.is_(None),
+                                 data_collection_api_calls.next_retry_at <= started))
+    progress.set_total(query.count())
+
+    worker_id = new_worker_id()
+    records = claimed_cells(db, worker_id, "error", batch_size=concurrency * 2, since=started, due_only=due_only)
+    summary = asyncio.run(crawl_and_save(
+        records, worker_id, api_key, db, concurrency,
+        commit_every=20, retry=True, progress=progress, seen_place_ids=_known_place_ids(db)
+    ))
+    return {
+        "total_retried": summary["processed"] + summary["errors"],
+        "successful_retries": summary["processed"],
+        "failed_retries": summary["errors"],
+        "leases_lost": summary["leases_lost"]
+    }
+
+@job_handler("fetch_restaurant_details")
+def fetch_restaurant_details_job(db: Session, params: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """Fetch and save Place Details for every discovered restaurant not saved yet"""
+    api_key = google_maps_api_key()
+    total = db.execute(PENDING_DETAILS_COUNT_SQL).scalar()
+    progress.set_total(total)
+    print(f"Fetching details for {total} restaurants")
+
+    async def drain():
+        saved = 0
+        pending = iter_pending_details(db)
+        async for entry in fetch_and_save_details(pending, api_key, db, params.get("concurrency", DEFAULT_CONCURRENCY), progress):
+            if entry.get("error") is None:
+                saved += 1
+        return saved
+
+    saved = asyncio.run(drain())
+    return {
+        "total_restaurants_found": total,
+        "total_restaurants_processed": saved,
+        "errors": progress.errors
+    }
+
+# Restaurants still without reviews/photos, oldest first; by default only those whose
+# halal status has not been classified yet
+HYDRATE_CANDIDATES_SQL = text("""
+    SELECT place_id FROM restaurants
+    WHERE hydrated_at IS NULL
+      AND place_id IS NOT NULL
+      AND (:include_classified OR halal_status IS NULL)
+    ORDER BY id
+    LIMIT :limit
+""")
+
+@job_handler("hydrate_restaurants")
+def hydrate_restaurants_job(db: Session, params: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """Fetch reviews and photos for restaurants saved with the lean crawl field set"""
+    api_key = google_maps_api_key()
+    place_ids = [place_id for (place_id,) in db.execute(HYDRATE_CANDIDATES_SQL, {
+        "include_classified": params.get("include_classified", False),
+        "limit": params.get("limit", 1000),
+    })]
+    progress.set_total(len(place_ids))
+
+    summary = asyncio.run(hydrate_restaurants(
+        place_ids, api_key, db, params.get("concurrency", DEFAULT_CONCURRENCY), progress
+    ))
+    return {
+        "total_candidates": len(place_ids),
+        "hydrated": summary["hydrated"],
+        "errors": summary["errors"]
+    }
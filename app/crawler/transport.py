@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+import httpx
+
+# "record:<path>" appends every Places response to a JSONL fixture file,
+# "replay:<path>" serves responses from one without touching the network
+PLACES_TRANSPORT = os.getenv("PLACES_TRANSPORT", "")
+
+# Requests sent per endpoint path by this process, read by the benchmark
+request_counts: Counter = Counter()
+
+def request_key(request: httpx.Request) -> str:
+    """Endpoint plus sorted query parameters, without the API key"""
+    params = sorted((k, v) for k, v in request.url.params.multi_items() if k != "key")
+    return json.dumps([request.url.path.rsplit("/", 2)[-2], params])
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request_counts[request.url.path.rsplit("/", 2)[-2]] += 1
+        return await self.inner.handle_async_request(request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests through and appends each (request, response) pair to a JSONL file"""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, path: str):
+        self.inner = inner
+        self.path = path
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        line = json.dumps({"key": request_key(request), "status": response.status_code, "body": body.decode("utf-8")})
+        with self.lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+        return httpx.Response(response.status_code, headers=response.headers, content=body)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded responses by request key. Repeated requests get the recorded
+    responses in order, and the last one once they run out; unknown requests get a 404.
+    """
+
+    def __init__(self, path: str):
+        self.responses: Dict[str, List[dict]] = {}
+        self.served: Counter = Counter()
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.responses.setdefault(entry["key"], []).append(entry)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        recorded = self.responses.get(key)
+        if not recorded:
+            return httpx.Response(404, json={"error": f"No recorded response for {key}"})
+        entry = recorded[min(self.served[key], len(recorded) - 1)]
+        self.served[key] += 1
+        return httpx.Response(entry["status"], content=entry["body"].encode("utf-8"),
+                              headers={"content-type": "application/json"})
+
+def places_transport(limits: httpx.Limits, mode: Optional[str] = None) -> httpx.AsyncBaseTransport:
+    """Transport for the Places HTTP client, according to PLACES_TRANSPORT"""
+    mode = PLACES_TRANSPORT if mode is None else mode
+    kind, _, path = mode.partition(":")
+    if kind == "replay":
+        return CountingTransport(ReplayTransport(path))
+    inner = httpx.AsyncHTTPTransport(limits=limits)
+    if kind == "record":
+        inner = RecordingTransport(inner, path)
+    return CountingTransport(inner)
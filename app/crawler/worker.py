@@ -0,0 +1,23 @@
+import time
+
+from sqlalchemy.orm import Session
+
+from app.database.connection import engine
+from app.crawler.jobs import claim_next_job, run_job
+import app.crawler.tasks  # noqa: F401 - registers the job handlers
+
+WORKER_POLL_INTERVAL = 5.0
+
+def main():
+    """Standalone crawl job worker: python -m app.crawler.worker"""
+    print("Crawl job worker started")
+    while True:
+        with Session(engine) as db:
+            job_id = claim_next_job(db)
+        if job_id is None:
+            time.sleep(WORKER_POLL_INTERVAL)
+            continue
+        run_job(job_id, claimed=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Sync vs async database layer benchmark.
+
+Serves the same read (a page of restaurants, optionally padded with pg_sleep to stand in
+for a slow query) from a `def` endpoint on the sync engine and an `async def` endpoint on
+the asyncpg engine, in a separate uvicorn process, then loads each at several concurrency
+levels and reports req/s and p50/p99 latency:
+
+    poetry run python -m app.database.benchmark
+    poetry run python -m app.database.benchmark --concurrency 10,100,400 --query-ms 20
+
+Both engines get the same connection pool (--pool-size), so with slow queries the sync
+endpoint is bounded by Starlette's threadpool (40 threads) and the async one by the pool.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+PAGE_SIZE = 50
+
+def create_benchmark_app():
+    """Benchmark app: /sync and /async run the same query. Started by uvicorn with --factory"""
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    from app.database import connection
+    from app.models.restaurant import Restaurant
+
+    connection.engine.echo = False
+    connection.async_engine.echo = False
+    query_seconds = float(os.getenv("BENCHMARK_QUERY_MS", "0")) / 1000
+    columns = [Restaurant.id, Restaurant.name, Restaurant.city, Restaurant.latitude, Restaurant.longitude]
+    page = select(*columns).order_by(Restaurant.id).limit(PAGE_SIZE)
+    sleep = select(func.pg_sleep(query_seconds))
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def read_sync(db: Session = Depends(connection.get_db)):
+        if query_seconds > 0:
+            db.execute(sleep)
+        return [dict(row) for row in db.execute(page).mappings()]
+
+    @app.get("/async")
+    async def read_async(db: AsyncSession = Depends(connection.get_async_db)):
+        if query_seconds > 0:
+            await db.execute(sleep)
+        return [dict(row) for row in (await db.execute(page)).mappings()]
+
+    return app
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(query_ms: float, pool_size: int) -> Tuple[subprocess.Popen, str]:
+    """Run the benchmark app in its own process, so the load generator doesn't share its GIL"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.database.benchmark:create_benchmark_app", "--factory",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env={**os.environ, "BENCHMARK_QUERY_MS": str(query_ms), "POSTGRES_POOL_SIZE": str(pool_size),
+             "POSTGRES_MAX_OVERFLOW": "0"},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            httpx.get(f"{base_url}/sync").raise_for_status()
+            return process, base_url
+        except httpx.HTTPError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("Benchmark server did not start")
+            time.sleep(0.2)
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+async def load(url: str, concurrency: int, requests: int) -> Dict[str, Any]:
+    """Issue `requests` GETs from `concurrency` concurrent clients"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def client(http: httpx.AsyncClient):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await http.get(url)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_second": round(len(latencies) / seconds, 1) if seconds > 0 else 0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+async def run_benchmark(base_url: str, levels: List[int], requests: int, warmup: int) -> List[Dict[str, Any]]:
+    report = []
+    for concurrency in levels:
+        for mode in ("sync", "async"):
+            url = f"{base_url}/{mode}"
+            await load(url, concurrency, warmup)
+            report.append({"mode": mode, "concurrency": concurrency, **await load(url, concurrency, requests)})
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sync and async database layers behind FastAPI")
+    parser.add_argument("--concurrency", default="1,10,50,200", help="comma-separated client concurrency levels")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per mode and concurrency level")
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests before each run")
+    parser.add_argument("--query-ms", type=float, default=0, help="pg_sleep added to each query, for slow-query load")
+    parser.add_argument("--pool-size", type=int, default=40, help="database connections per engine")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    process, base_url = start_server(args.query_ms, args.pool_size)
+    try:
+        report = asyncio.run(run_benchmark(base_url, levels, args.requests, args.warmup))
+    finally:
+        process.terminate()
+        process.wait()
+
+    columns = ["mode", "concurrency", "requests", "errors", "req_per_second", "p50_ms", "p99_ms"]
+    widths = [max(len(column), *(len(str(row[column])) for row in report)) for column in columns]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for row in report:
+        print("  ".join(str(row[column]).rjust(width) for column, width in zip(columns, widths)))
+
+if __name__ == "__main__":
+    main()
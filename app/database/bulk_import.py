@@ -0,0 +1,155 @@
+import codecs
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+from app.database.connection import engine
+from app.database.upsert import RestaurantWriter, WriteResult
+from app.schemas.restaurant import RestaurantCreate
+
+BULK_CHUNK_SIZE = 1000  # rows per upsert batch
+MAX_RECORD_BYTES = 1024 * 1024  # a longer line (or CSV record) aborts the import
+
+class RecordTooLong(Exception):
+    pass
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream as UTF-8 and yield it line by line, holding one line at most"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if len(pending) > MAX_RECORD_BYTES:
+            raise RecordTooLong(f"Line longer than {MAX_RECORD_BYTES} bytes")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+async def iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """(line number, parsed object, or the ValueError it raised) per non-blank line"""
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, e
+
+async def iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    (line number, row dict) per CSV record; the first record is the header. Quoted fields may
+    span lines: a record is complete once it holds an even number of quotes. Empty cells are None.
+    """
+    header = None
+    record, start, number = "", 0, 0
+    async for line in lines:
+        number += 1
+        if not record:
+            start = number
+        record += line
+        if record.count('"') % 2:
+            if len(record) > MAX_RECORD_BYTES:
+                raise RecordTooLong(f"CSV record starting on line {start} is longer than {MAX_RECORD_BYTES} bytes")
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader(io.StringIO(text)))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield start, {name: (value if value != "" else None) for name, value in zip(header, values)}
+    if record:
+        yield start, ValueError("Unterminated quoted field at end of input")
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for generators that are still reading the request body. The stock one
+    also listens for a client disconnect, which consumes (and drops) the body's messages;
+    here the body stream itself raises ClientDisconnect when the client goes away.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors())
+
+def write_rows(writer: RestaurantWriter, rows: List[Tuple[int, Dict[str, Any]]]) -> List[WriteResult]:
+    results = []
+    for line, row in rows:
+        results.extend(writer.add(row, context=line))
+    return results + writer.flush()
+
+async def import_restaurants(chunks: AsyncIterator[bytes], body_format: str,
+                             chunk_size: int = BULK_CHUNK_SIZE) -> AsyncIterator[str]:
+    """
+    Validate each record of an NDJSON or CSV body against RestaurantCreate and upsert the
+    valid ones on place_id in chunks, as the body arrives. Yields an NDJSON line per rejected
+    row ({"line", "error"}) and a final summary line. Only the current chunk is held in memory,
+    and database work runs in the threadpool so the event loop keeps streaming.
+    """
+    records = iter_csv(iter_lines(chunks)) if body_format == "csv" else iter_ndjson(iter_lines(chunks))
+    summary = {"summary": True, "rows": 0, "saved": 0, "errors": 0}
+
+    def rejected(line: int, error: str) -> str:
+        summary["errors"] += 1
+        return json.dumps({"line": line, "error": error}) + "\n"
+
+    with Session(engine) as db:
+        # Loading a partner's certified list is what imports are for, so halal_status is updated too
+        writer = RestaurantWriter(db, chunk_size=chunk_size, insert_only=())
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+
+        async def flush():
+            results = await run_in_threadpool(write_rows, writer, batch)
+            batch.clear()
+            lines = []
+            for result in results:
+                if result.error is None:
+                    summary["saved"] += 1
+                else:
+                    lines.append(rejected(result.context, result.error))
+            return lines
+
+        try:
+            async for line, record in records:
+                summary["rows"] += 1
+                if isinstance(record, Exception):
+                    yield rejected(line, f"Invalid {body_format}: {record}")
+                    continue
+                if not isinstance(record, dict):
+                    yield rejected(line, "Expected a JSON object")
+                    continue
+                try:
+                    restaurant = RestaurantCreate(**record)
+                except ValidationError as e:
+                    yield rejected(line, validation_message(e))
+                    continue
+                batch.append((line, restaurant.dict()))
+                if len(batch) >= chunk_size:
+                    for error_line in await flush():
+                        yield error_line
+        except (RecordTooLong, UnicodeDecodeError) as e:
+            summary["aborted"] = str(e)
+
+        if batch:
+            for error_line in await flush():
+                yield error_line
+    yield json.dumps(summary) + "\n"
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import declarative_base
 import os
 
@@ -8,11 +9,17 @@ DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "root")
 DB_HOST = os.getenv("POSTGRES_HOST", "localhost")
 DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 DB_NAME = os.getenv("POSTGRES_DB", "halal_site_db")
+# Connections per engine (and process): POOL_SIZE kept open, up to MAX_OVERFLOW more under load
+DB_POOL_SIZE = int(os.getenv("POSTGRES_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("POSTGRES_MAX_OVERFLOW", "10"))
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Create engine
-engine = create_engine(DATABASE_URL, echo=True)
+# Create engines: the sync one for the crawler, jobs and the remaining `def` endpoints,
+# the async one (asyncpg) for `async def` endpoints, so they don't hold a threadpool slot
+engine = create_engine(DATABASE_URL, echo=True, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=True, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
 
 # Create base class for models
 Base = declarative_base()
@@ -25,4 +32,10 @@ def get_db():
     """Get database session"""
     from sqlalchemy.orm import Session
     with Session(engine) as session:
-        yield session 
\ No newline at end of file
+        yield session
+
+async def get_async_db():
+    """Get async database session"""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    async with AsyncSession(async_engine) as session:
+        yield session
@@ -0,0 +1,60 @@
+import os
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Delta rows left unfolded before a read compacts them
+FACET_COMPACT_ROWS = int(os.getenv("FACET_COMPACT_ROWS", "1000"))
+COMPACTION_LOCK = 7_346_291  # pg advisory lock key, so only one session compacts at a time
+
+# Restaurant facets offered to filter UIs; "restaurants" holds the total
+RESTAURANT_FACETS = ["city", "cuisine_type", "price_range", "halal_status", "rating"]
+
+FacetCounts = Dict[str, Dict[Optional[str], int]]
+
+READ_SQL = text("""
+    SELECT facet, value, sum(count) AS total, count(*) AS deltas
+    FROM facet_counts
+    GROUP BY facet, value
+""")
+
+COMPACT_SQL = text("""
+    WITH folded AS (DELETE FROM facet_counts RETURNING facet, value, count)
+    INSERT INTO facet_counts (facet, value, count)
+    SELECT facet, value, sum(count) FROM folded
+    GROUP BY facet, value HAVING sum(count) <> 0
+""")
+
+def read_facet_counts(db: Session) -> FacetCounts:
+    """
+    Current counts by facet and value, e.g. {"city": {"Toronto": 120, None: 3}}. Triggers on
+    restaurants and data_collection_api_calls append net deltas to facet_counts on every write,
+    so this reads a table the size of the distinct values, never the source tables. Folds the
+    deltas back into one row per value once enough have piled up.
+    Crawl progress is under "cells" (by status), "api_calls_made" and "restaurants_found".
+    """
+    counts: FacetCounts = {}
+    pending = 0
+    for facet, value, total, deltas in db.execute(READ_SQL):
+        pending += deltas - 1
+        if total:
+            counts.setdefault(facet, {})[value] = int(total)
+    if pending >= FACET_COMPACT_ROWS:
+        compact_facet_counts(db)
+    return counts
+
+def compact_facet_counts(db: Session) -> bool:
+    """
+    Replace the delta rows with one row per (facet, value), and commit. False if another
+    session is already compacting.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": COMPACTION_LOCK}).scalar():
+        return False
+    db.execute(COMPACT_SQL)
+    db.commit()
+    return True
+
+def facet_total(counts: FacetCounts, facet: str) -> int:
+    """Value of a facet that is a single number (the restaurant total, crawl call sums)"""
+    return counts.get(facet, {}).get(None, 0)
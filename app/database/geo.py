@@ -0,0 +1,78 @@
+import math
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+
+GEOHASH_PRECISION = 9  # characters stored per restaurant (~5 m cells)
+EARTH_RADIUS_METERS = 6_371_000
+METERS_PER_DEGREE = 111_320
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash_encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash of a point; points sharing a prefix lie in the same cell"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate longitude, latitude, starting with longitude
+        interval, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+def point_geohash(lat: Optional[float], lng: Optional[float]) -> Optional[str]:
+    if lat is None or lng is None:
+        return None
+    return geohash_encode(lat, lng)
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(latitude, longitude) degrees spanned by a geohash cell of `precision` characters"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+def covering_prefixes(lat: float, lng: float, radius: float) -> List[str]:
+    """
+    Geohash prefixes whose cells together cover the circle of `radius` meters around a point:
+    the cell containing it and its eight neighbours, at the finest precision whose cells are
+    still at least `radius` across.
+    """
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        lat_size, lng_size = cell_size(candidate)
+        if min(lat_size, lng_size * math.cos(math.radians(lat))) * METERS_PER_DEGREE >= radius:
+            precision = candidate
+            break
+    lat_size, lng_size = cell_size(precision)
+    prefixes = set()
+    for d_lat in (-lat_size, 0, lat_size):
+        for d_lng in (-lng_size, 0, lng_size):
+            neighbour_lat = max(-90.0, min(90.0, lat + d_lat))
+            neighbour_lng = (lng + d_lng + 180) % 360 - 180
+            prefixes.add(geohash_encode(neighbour_lat, neighbour_lng, precision))
+    return sorted(prefixes)
+
+def bounding_box(lat: float, lng: float, radius: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) of the circle of `radius` meters around a point"""
+    d_lat = radius / METERS_PER_DEGREE
+    d_lng = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - d_lat, lat + d_lat, lng - d_lng, lng + d_lng
+
+def haversine_sql(lat_column, lng_column, lat: float, lng: float):
+    """SQL expression for the great-circle distance in meters from a point"""
+    d_lat = func.radians(lat_column - lat) / 2
+    d_lng = func.radians(lng_column - lng) / 2
+    a = func.power(func.sin(d_lat), 2) + (
+        math.cos(math.radians(lat)) * func.cos(func.radians(lat_column)) * func.power(func.sin(d_lng), 2)
+    )
+    return 2 * EARTH_RADIUS_METERS * func.asin(func.least(1.0, func.sqrt(a)))
@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+READ_CACHE_ENABLED = os.getenv("READ_CACHE_ENABLED", "true").lower() == "true"
+READ_CACHE_TTL = float(os.getenv("READ_CACHE_TTL", "60"))  # seconds; also bounds staleness across processes
+READ_CACHE_MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", "2048"))
+# "memory" for a per-process cache, "sqlite" to share one (and its invalidations) between
+# the API and crawl worker processes on the same machine
+READ_CACHE_BACKEND = os.getenv("READ_CACHE_BACKEND", "memory")
+READ_CACHE_PATH = os.getenv("READ_CACHE_PATH", ".cache/read_cache.sqlite3")
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str  # strong ETag, quoted
+
+def make_response(body: bytes) -> CachedResponse:
+    return CachedResponse(body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+class MemoryBackend:
+    """LRU of serialized responses with a TTL, local to the process"""
+
+    blocking = False
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (CachedResponse, stored at)
+        self.current_generation = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] > self.ttl_seconds:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, response: CachedResponse, generation: int):
+        with self.lock:
+            if generation != self.current_generation:
+                return  # invalidated while the response was being built
+            self.entries[key] = (response, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def generation(self) -> int:
+        with self.lock:
+            return self.current_generation
+
+    def invalidate(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_generation += 1
+
+class SQLiteBackend:
+    """
+    Cache in a local SQLite file, so invalidations made by one process (e.g. the crawl
+    worker saving restaurants) are seen by every process using the same file.
+    """
+
+    blocking = True  # disk I/O, kept off the event loop
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS generation (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)")
+        self.connection.execute("INSERT OR IGNORE INTO generation (id, value) VALUES (1, 0)")
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT body, etag FROM responses WHERE key = ? AND created_at >= ?", (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+        return CachedResponse(row[0], row[1])
+
+    def set(self, key: str, response: CachedResponse, generation: int):
+        now = time.time()
+        with self.lock:
+            # Only store if nothing was invalidated while the response was being built
+            self.connection.execute("""
+                INSERT OR REPLACE INTO responses (key, body, etag, created_at, accessed_at)
+                SELECT ?, ?, ?, ?, ? WHERE (SELECT value FROM generation WHERE id = 1) = ?
+            """, (key, response.body, response.etag, now, now, generation))
+            self.connection.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.connection.commit()
+
+    def generation(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT value FROM generation WHERE id = 1").fetchone()[0]
+
+    def invalidate(self):
+        with self.lock:
+            self.connection.execute("UPDATE generation SET value = value + 1 WHERE id = 1")
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+
+class ReadCache:
+    """
+    Read-through cache of serialized restaurant responses. Concurrent misses for the same
+    key are coalesced: one caller builds the response, the others wait for it.
+    Any commit that touched the restaurants table invalidates everything.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _backend(self, method: Callable, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[bytes]]) -> CachedResponse:
+        cached = await self._backend(self.backend.get, key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        flight = self.in_flight.get(key)
+        if flight is not None:
+            # shield: a waiter going away must not cancel the build for the others
+            response = await asyncio.shield(flight)
+            self.hits += 1
+            return response
+
+        flight = self.in_flight[key] = asyncio.get_running_loop().create_future()
+        self.misses += 1
+        try:
+            generation = await self._backend(self.backend.generation)
+            response = make_response(await load())
+            await self._backend(self.backend.set, key, response, generation)
+            flight.set_result(response)
+            return response
+        except BaseException as e:
+            flight.set_exception(e)
+            flight.exception()  # retrieved, so a miss nobody else waited on isn't logged as unhandled
+            raise
+        finally:
+            del self.in_flight[key]
+
+    def invalidate(self):
+        self.backend.invalidate()
+
+class NullCache:
+    """Stand-in when READ_CACHE_ENABLED=false: every read is a miss"""
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[bytes]]) -> CachedResponse:
+        return make_response(await load())
+
+    def invalidate(self):
+        pass
+
+_read_cache = None
+_read_cache_lock = threading.Lock()
+
+def get_read_cache():
+    """Process-wide cache of restaurant read responses"""
+    global _read_cache
+    with _read_cache_lock:
+        if _read_cache is None:
+            if not READ_CACHE_ENABLED:
+                _read_cache = NullCache()
+            elif READ_CACHE_BACKEND == "sqlite":
+                _read_cache = ReadCache(SQLiteBackend(READ_CACHE_PATH, READ_CACHE_TTL, READ_CACHE_MAX_ENTRIES))
+            else:
+                _read_cache = ReadCache(MemoryBackend(READ_CACHE_TTL, READ_CACHE_MAX_ENTRIES))
+        return _read_cache
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check, with the weak comparison RFC 9110 prescribes for it"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+# Invalidate on commit whenever a session wrote to restaurants, whichever code path did it
+# (the API, the crawler's RestaurantWriter upserts or hydration)
+
+@event.listens_for(Session, "before_flush")
+def _track_restaurant_flush(session, flush_context, instances):
+    from app.models.restaurant import Restaurant
+    if any(isinstance(obj, Restaurant) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["restaurants_changed"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_restaurant_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if getattr(table, "name", None) == "restaurants":
+            orm_execute_state.session.info["restaurants_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("restaurants_changed", False):
+        get_read_cache().invalidate()
@@ -0,0 +1,134 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.database.geo import point_geohash
+from app.models.restaurant import Restaurant
+
+RESTAURANT_COLUMNS = {column.name for column in Restaurant.__table__.columns} - {"id", "search_vector"}
+
+class WriteResult(NamedTuple):
+    context: Any  # whatever the caller passed to add(), e.g. the source row
+    id: Optional[int]  # restaurants.id of the inserted or updated row
+    error: Optional[str]
+
+class RestaurantWriter:
+    """
+    Buffers restaurant rows and writes them in chunks with
+    INSERT ... ON CONFLICT (place_id) DO UPDATE ... RETURNING id.
+    An update only fills in what the row carries: NULL or missing values keep the stored
+    ones (so the crawler's empty halal_status never clears a curated one), `insert_only`
+    columns are only set on insert, and scraped_json is merged into the stored payload,
+    so a lean re-crawl keeps the reviews and photos hydration added.
+    Each chunk runs in a savepoint; if it fails, its rows are retried one by one so a single
+    bad row is reported on its own instead of rolling back the whole chunk.
+    """
+
+    def __init__(self, db: Session, chunk_size: int = 500, commit: bool = True,
+                 insert_only: Iterable[str] = ()):
+        self.db = db
+        self.insert_only = set(insert_only)
+        self.chunk_size = chunk_size
+        self.commit = commit
+        self.buffer: List[Dict[str, Any]] = []
+        self.contexts: List[Any] = []
+        self.written = 0
+        self.failed = 0
+
+    def add(self, row: Dict[str, Any], context: Any = None) -> List[WriteResult]:
+        """Buffer a row; returns the results of the chunk if this row filled it"""
+        row = {key: value for key, value in row.items() if key in RESTAURANT_COLUMNS}
+        if "latitude" in row or "longitude" in row:
+            row["geohash"] = point_geohash(row.get("latitude"), row.get("longitude"))
+        self.buffer.append(row)
+        self.contexts.append(context)
+        if len(self.buffer) >= self.chunk_size:
+            return self.flush()
+        return []
+
+    def flush(self) -> List[WriteResult]:
+        """Write everything buffered and return one result per row, in the order added"""
+        if not self.buffer:
+            return []
+        rows, contexts = self.buffer, self.contexts
+        self.buffer, self.contexts = [], []
+
+        # ON CONFLICT cannot touch the same row twice in one statement; the last version wins
+        last_index = {row["place_id"]: i for i, row in enumerate(rows) if row.get("place_id")}
+        results: List[Optional[WriteResult]] = [None] * len(rows)
+        unique = []
+        for i, row in enumerate(rows):
+            if row.get("place_id") and last_index[row["place_id"]] != i:
+                results[i] = WriteResult(contexts[i], None, "superseded by a later row with the same place_id")
+            else:
+                unique.append(i)
+
+        try:
+            with self.db.begin_nested():
+                ids = self._upsert([rows[i] for i in unique])
+            for i, row_id in zip(unique, ids):
+                results[i] = WriteResult(contexts[i], row_id, None)
+        except Exception:
+            # Isolate the bad rows
+            for i in unique:
+                try:
+                    with self.db.begin_nested():
+                        results[i] = WriteResult(contexts[i], self._upsert([rows[i]])[0], None)
+                except Exception as e:
+                    results[i] = WriteResult(contexts[i], None, str(getattr(e, "orig", e)).strip())
+
+        if self.commit:
+            self.db.commit()
+        for result in results:
+            if result.error is None:
+                self.written += 1
+            else:
+                self.failed += 1
+        return results
+
+    def _updates(self, statement, columns: List[str]) -> Dict[str, Any]:
+        """SET clause of the ON CONFLICT update"""
+        table = Restaurant.__table__
+        updates = {}
+        for column in columns:
+            if column == "place_id" or column in self.insert_only:
+                continue
+            new, stored = statement.excluded[column], table.c[column]
+            if column == "scraped_json":
+                both_objects = and_(func.jsonb_typeof(stored) == "object", func.jsonb_typeof(new) == "object")
+                updates[column] = func.coalesce(case((both_objects, stored.op("||")(new)), else_=new), stored)
+            else:
+                updates[column] = func.coalesce(new, stored)
+        # DO UPDATE needs something to set for RETURNING to see the existing row
+        return updates or {"place_id": statement.excluded.place_id}
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Multi-row upsert; returns the ids in the same order as `rows`"""
+        # Rows in one executemany must share keys, so missing columns become NULL
+        columns = sorted(set().union(*rows))
+        values = [{column: row.get(column) for column in columns} for row in rows]
+        # render_nulls: otherwise the ORM leaves out None values and splits the batch by key set
+        options = {"render_nulls": True}
+        keyed = [i for i, row in enumerate(values) if row.get("place_id")]
+        unkeyed = [i for i, row in enumerate(values) if not row.get("place_id")]
+        ids: List[Optional[int]] = [None] * len(values)
+
+        if keyed:
+            # RETURNING order is not guaranteed for a batched upsert (SQLAlchemy falls back to
+            # a row at a time if asked for it), so match the returned ids on place_id instead
+            statement = insert(Restaurant)
+            updates = self._updates(statement, columns)
+            statement = statement.on_conflict_do_update(index_elements=["place_id"], set_=updates).returning(
+                Restaurant.place_id, Restaurant.id
+            )
+            returned = dict(self.db.execute(statement, [values[i] for i in keyed], execution_options=options).all())
+            for i in keyed:
+                ids[i] = returned[values[i]["place_id"]]
+        if unkeyed:
+            # Without a place_id nothing can conflict: a plain insert, batched in order
+            statement = insert(Restaurant).returning(Restaurant.id, sort_by_parameter_order=True)
+            for i, row_id in zip(unkeyed, self.db.scalars(statement, [values[i] for i in unkeyed], execution_options=options)):
+                ids[i] = row_id
+        return ids
@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from app.routers import health, database, auth
 from app.routers import restaurant
 from app.routers import data_collection
+from app.routers import crawl_jobs
+from app.routers import metrics
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,4 +15,6 @@ app.include_router(health.router, tags=["health"])
 app.include_router(database.router, prefix="/db", tags=["database"])
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
 app.include_router(restaurant.router) 
-app.include_router(data_collection.router, tags=["data_collection"])
\ No newline at end of file
+app.include_router(data_collection.router, tags=["data_collection"])
+app.include_router(crawl_jobs.router)
+app.include_router(metrics.router, tags=["metrics"])
\ No newline at end of file
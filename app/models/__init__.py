@@ -2,4 +2,7 @@
 from .user import User
 from .restaurant import Restaurant
 from .item import Item
-from .data_collection import data_collection_api_calls 
\ No newline at end of file
+from .data_collection import data_collection_api_calls 
+from .rate_limit import RateLimitBucket
+from .crawl_job import CrawlJob
+from .discovered_place import DiscoveredPlace
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON
+from sqlalchemy.sql import func
+from app.database.connection import Base
+
+class CrawlJob(Base):
+    __tablename__ = "crawl_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String, nullable=False)  # process_locations, retry_failed, fetch_restaurant_details
+    status = Column(String, nullable=False, default="queued", index=True)  # queued, running, completed, failed, cancelled
+    params = Column(JSON, nullable=True)
+    total_items = Column(Integer, default=0)
+    processed_items = Column(Integer, default=0)
+    error_items = Column(Integer, default=0)
+    api_calls = Column(Integer, default=0)
+    result = Column(JSON, nullable=True)
+    error_message = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,9 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean,Float,JSON,Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean,Float,JSON,Text,ForeignKey,UniqueConstraint,Index,LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.database.connection import Base
 
 class data_collection_api_calls(Base): 
     __tablename__ = 'data_collection_api_calls'
+    # One row per grid cell, so regenerating the grid is a no-op for existing cells
+    __table_args__ = (
+        UniqueConstraint('latitude', 'longitude', 'cell_size', name='uq_data_collection_cell'),
+        Index('ix_data_collection_claim', 'status', 'depth', 'id'),
+        Index('ix_data_collection_retry', 'status', 'next_retry_at'),
+    )
     
     id =Column(Integer, primary_key=True)
     latitude = Column(Float,nullable=False)
@@ -17,4 +25,18 @@ class data_collection_api_calls(Base):
     api_calls_made = Column(Integer, default=0)
     retry_count = Column(Integer, default=0)
     max_retries = Column(Integer, default=3)
-    response_body = Column(JSON)
\ No newline at end of file
+    # Raw results are optional and deferred; discovered_places holds the place_ids
+    response_body = deferred(Column(JSONB))  # only kept when CRAWL_RAW_RESPONSES=json
+    response_body_gz = deferred(Column(LargeBinary, nullable=True))  # zlib-compressed JSON (CRAWL_RAW_RESPONSES=compressed)
+    # Adaptive quadtree: coarse cells are split into four children when they are dense
+    parent_id = Column(Integer, ForeignKey('data_collection_api_calls.id'), nullable=True, index=True)
+    depth = Column(Integer, nullable=False, default=0)
+    cell_size = Column(Float, nullable=True)  # side of the cell in degrees
+    radius = Column(Integer, nullable=True)  # search radius in meters
+    new_places_found = Column(Integer, default=0)  # place_ids not found by any earlier cell
+    # Work leases: a worker owns the cell until it writes a result or the lease expires
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    # Retry queue: failed cells are retried once due, best candidates first
+    next_retry_at = Column(DateTime(timezone=True), nullable=True)
+    error_class = Column(String, nullable=True)  # network, upstream, quota or other
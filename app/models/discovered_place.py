@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database.connection import Base
+
+class DiscoveredPlace(Base):
+    __tablename__ = "discovered_places"
+
+    # One row per (cell, place) seen during the crawl; replaces parsing response_body blobs
+    cell_id = Column(Integer, ForeignKey('data_collection_api_calls.id', ondelete='CASCADE'), primary_key=True)
+    place_id = Column(String, primary_key=True, index=True)
+    query = Column(String, nullable=True)  # search template that found it first in this cell
+    first_seen = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, BigInteger, String, Index
+from app.database.connection import Base
+
+class FacetCount(Base):
+    __tablename__ = "facet_counts"
+    # Append-only deltas; the count of a (facet, value) is the sum of its rows (see app/database/facets.py).
+    # Rows are written by statement-level triggers on restaurants and data_collection_api_calls, which
+    # only exist in the migration (alembic/versions/b5d8e2f17c39_add_facet_counts.py)
+    __table_args__ = (
+        Index('ix_facet_counts_facet_value', 'facet', 'value'),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    facet = Column(String, nullable=False)  # e.g. city, rating, cells
+    value = Column(String, nullable=True)  # None counts the rows without a value (or the facet has none)
+    count = Column(BigInteger, nullable=False)
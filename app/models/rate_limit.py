@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Float, DateTime
+from app.database.connection import Base
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    # Shared token bucket state for PostgresTokenBucket, one row per limited API
+    name = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
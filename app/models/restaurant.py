@@ -1,5 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Index, Computed, event
+from sqlalchemy.orm import deferred
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from app.database.connection import Base
+from app.database.geo import point_geohash
 
 class Restaurant(Base):
     __tablename__ = "restaurants"
@@ -21,5 +24,35 @@ class Restaurant(Base):
     price_range = Column(String, nullable=True)
     halal_status = Column(String, nullable=True)
     rating = Column(Float, nullable=True)
-    scraped_json = Column(JSON, nullable=True)
-    additional_info = Column(Text, nullable=True) 
\ No newline at end of file
+    # Fields of the Google payload that are filtered on, promoted out of scraped_json
+    user_ratings_total = Column(Integer, nullable=True, index=True)
+    business_status = Column(String, nullable=True, index=True)  # OPERATIONAL, CLOSED_TEMPORARILY, CLOSED_PERMANENTLY
+    types = Column(ARRAY(String), nullable=True)
+    # The whole Place Details payload (tens of KB with reviews and photos); only loaded when asked for
+    scraped_json = deferred(Column(JSONB(none_as_null=True), nullable=True))  # None is stored as SQL NULL, not JSON null
+    additional_info = Column(Text, nullable=True)
+    hydrated_at = Column(DateTime(timezone=True), nullable=True)  # when reviews/photos were added to scraped_json 
+    geohash = Column(String(12), nullable=True)  # derived from latitude/longitude, for /restaurants/nearby
+    # Weighted full-text document for /restaurants/search, kept up to date by Postgres.
+    # Only the search query reads it, so it is not loaded with the row.
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(cuisine_type, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+        "setweight(to_tsvector('english', coalesce(address, '')), 'D')",
+        persisted=True
+    ), nullable=True))
+
+    __table_args__ = (
+        # varchar_pattern_ops so geohash LIKE 'prefix%' is an index range scan whatever the collation
+        Index("ix_restaurants_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),
+        Index("ix_restaurants_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_restaurants_types", "types", postgresql_using="gin"),
+        # ix_restaurants_name_prefix (lower(name) text_pattern_ops) and, where pg_trgm is
+        # available, ix_restaurants_name_trgm back /restaurants/suggest; see migration 7d3f1a9c6e25
+    )
+
+@event.listens_for(Restaurant, "before_insert")
+@event.listens_for(Restaurant, "before_update")
+def _set_geohash(mapper, connection, target):
+    target.geohash = point_geohash(target.latitude, target.longitude)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database.connection import get_db
+from app.models.crawl_job import CrawlJob
+from app.schemas.crawl_job import CrawlJobResponse
+from app.crawler.jobs import cancel_job, job_rates
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["crawl_jobs"]
+)
+
+def _job_response(job: CrawlJob) -> CrawlJobResponse:
+    response = CrawlJobResponse.model_validate(job)
+    return response.model_copy(update=job_rates(job))
+
+@router.get("/", response_model=List[CrawlJobResponse])
+def list_jobs(status: Optional[str] = None, limit: int = 50, db: Session = Depends(get_db)):
+    query = db.query(CrawlJob)
+    if status:
+        query = query.filter(CrawlJob.status == status)
+    return [_job_response(job) for job in query.order_by(CrawlJob.id.desc()).limit(limit).all()]
+
+@router.get("/{job_id}", response_model=CrawlJobResponse)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Job status with progress, throughput (items/s, calls/s) and ETA"""
+    job = db.query(CrawlJob).filter(CrawlJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+@router.post("/{job_id}/cancel", response_model=CrawlJobResponse)
+def cancel(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(CrawlJob).filter(CrawlJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status not in ("queued", "running"):
+        raise HTTPException(status_code=400, detail=f"Job is already {job.status}")
+    return _job_response(cancel_job(db, job))
@@ -1,16 +1,16 @@
 from fastapi import APIRouter
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.database.connection import engine
+from app.database.connection import async_engine
 
 router = APIRouter()
 
 @router.get("/db-check")
-def db_check():
+async def db_check():
     try:
-        with Session(engine) as session:
+        async with AsyncSession(async_engine) as session:
             # Simple query to test connection
-            session.execute(text("SELECT 1"))
+            await session.execute(text("SELECT 1"))
         return {"db_status": "connected"}
     except Exception as e:
         return {"db_status": "error", "details": str(e)} 
\ No newline at end of file
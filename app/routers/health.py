@@ -3,9 +3,9 @@ from fastapi import APIRouter
 router = APIRouter()
 
 @router.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
 @router.get("/hello")
-def hello():
+async def hello():
     return {"message": "Hello, world!"} 
\ No newline at end of file
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.crawler.metrics import places_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Google Places call counters and latency histograms in the Prometheus text format"""
+    return PlainTextResponse(places_metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,50 +1,295 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy import func, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pydantic import TypeAdapter
 from app.models.restaurant import Restaurant
-from app.schemas.restaurant import RestaurantCreate, RestaurantRead, RestaurantUpdate
-from app.database.connection import get_db
+from app.schemas.restaurant import (
+    NearbyRestaurant, RestaurantCreate, RestaurantFacets, RestaurantPage, RestaurantRaw, RestaurantRead,
+    RestaurantReadRaw, RestaurantSearchResult, RestaurantSuggestion, RestaurantUpdate
+)
+from app.database.connection import engine, get_async_db
+from app.database.upsert import RestaurantWriter, WriteResult
+from app.database.facets import RESTAURANT_FACETS, facet_total, read_facet_counts
+from app.database.bulk_import import BodyStreamingResponse, import_restaurants
+from app.database.geo import bounding_box, covering_prefixes, haversine_sql
+from app.database.read_cache import etag_matches, get_read_cache
+from app.crawler.tasks import hydrate_restaurant
+import os
 
 router = APIRouter(
     prefix="/restaurants",
     tags=["restaurants"]
 )
 
+async def cached_json(request: Request, key: str, build: Callable[[], Awaitable[bytes]]) -> Response:
+    """
+    Serve a read from the response cache, building it on a miss. Clients that send back the
+    ETag in If-None-Match get a 304 while the data is unchanged. Writes to restaurants
+    invalidate the cache when they commit (see app/database/read_cache.py).
+    """
+    cached = await get_read_cache().get_or_load(key, build)
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+def write_restaurant(db: Session, row: Dict[str, Any]) -> WriteResult:
+    writer = RestaurantWriter(db)
+    writer.add(row)
+    return writer.flush()[0]
+
 @router.post("/", response_model=RestaurantRead)
-def create_restaurant(restaurant: RestaurantCreate, db: Session = Depends(get_db)):
-    db_restaurant = Restaurant(**restaurant.dict())
-    db.add(db_restaurant)
-    db.commit()
-    db.refresh(db_restaurant)
-    return db_restaurant
+async def create_restaurant(restaurant: RestaurantCreate, db: AsyncSession = Depends(get_async_db)):
+    # Upsert on place_id, so re-posting a known Google place updates it instead of failing
+    result = await db.run_sync(write_restaurant, restaurant.dict())
+    if result.error is not None:
+        raise HTTPException(status_code=400, detail=result.error)
+    return await db.get(Restaurant, result.id)
+
+@router.post("/bulk")
+async def bulk_import_restaurants(request: Request, format: Optional[str] = Query(None, pattern="^(ndjson|csv)$")):
+    """
+    Import restaurants from a streamed NDJSON (one RestaurantCreate object per line) or CSV
+    (header row of RestaurantCreate field names) body, upserting on place_id in chunks as it
+    arrives. The format comes from `format`, else the Content-Type (text/csv or NDJSON).
+    Streams back NDJSON: one {"line", "error"} entry per rejected row, then a summary line.
+    """
+    body_format = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    return BodyStreamingResponse(import_restaurants(request.stream(), body_format), media_type="application/x-ndjson")
+
+# Columns that can be asked for with `fields`, and those returned by default: everything but the raw Google payload
+FIELDS = [column.name for column in Restaurant.__table__.columns if column.name != "search_vector"]
+LIST_FIELDS = [name for name in FIELDS if name != "scraped_json"]
+MAX_PAGE_SIZE = 200
+
+@router.get("/", response_model=RestaurantPage, response_model_exclude_unset=True)
+async def read_restaurants(request: Request, after: Optional[int] = None, limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+                           fields: Optional[str] = None, business_status: Optional[str] = None,
+                           place_type: Optional[str] = Query(None, alias="type"), min_ratings: Optional[int] = Query(None, ge=0),
+                           db: AsyncSession = Depends(get_async_db)):
+    """
+    List restaurants by id, one page at a time. Pass the returned `next_cursor` as `after`
+    to get the next page; each page is an index range scan, however deep it is.
+    `fields` is a comma-separated list of columns to return (`id` is always included);
+    `scraped_json` is only returned when asked for.
+    Filters: `business_status` (e.g. OPERATIONAL), `type` (a Google place type, e.g.
+    meal_takeaway) and `min_ratings` (at least that many user ratings).
+    """
+    names = LIST_FIELDS
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    columns = [Restaurant.id] + [Restaurant.__table__.columns[name] for name in names if name != "id"]
+
+    async def build() -> bytes:
+        query = select(*columns).order_by(Restaurant.id).limit(limit + 1)
+        if after is not None:
+            query = query.where(Restaurant.id > after)
+        if business_status is not None:
+            query = query.where(Restaurant.business_status == business_status)
+        if place_type is not None:
+            query = query.where(Restaurant.types.contains([place_type]))
+        if min_ratings is not None:
+            query = query.where(Restaurant.user_ratings_total >= min_ratings)
+        rows = (await db.execute(query)).mappings().all()
+
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        page = RestaurantPage.model_validate({"items": [dict(row) for row in rows[:limit]], "next_cursor": next_cursor})
+        return page.model_dump_json(exclude_unset=True).encode("utf-8")
+
+    key = f"list:{after}:{limit}:{','.join(column.name for column in columns)}:{business_status}:{place_type}:{min_ratings}"
+    return await cached_json(request, key, build)
+
+MAX_NEARBY_RADIUS = 50_000  # meters
+NEARBY_START_RADIUS = 500  # first radius tried when looking for the k nearest
+NearbyRestaurants = TypeAdapter(List[NearbyRestaurant])
+
+async def query_nearby(db: AsyncSession, lat: float, lng: float, radius: float, limit: int) -> List[dict]:
+    """Restaurants within `radius` meters of a point, nearest first"""
+    distance = haversine_sql(Restaurant.latitude, Restaurant.longitude, lat, lng).label("distance_m")
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius)
+    columns = [Restaurant.__table__.columns[name] for name in LIST_FIELDS]
+    query = (
+        select(*columns, distance)
+        # The geohash prefixes pick the candidates off the index; the box and the distance trim them
+        .where(or_(*[Restaurant.geohash.like(prefix + "%") for prefix in covering_prefixes(lat, lng, radius)]))
+        .where(Restaurant.latitude.between(min_lat, max_lat), Restaurant.longitude.between(min_lng, max_lng))
+        .where(distance <= radius)
+        .order_by(distance, Restaurant.id)
+        .limit(limit)
+    )
+    return [dict(row) for row in (await db.execute(query)).mappings()]
+
+@router.get("/nearby", response_model=List[NearbyRestaurant])
+async def read_nearby_restaurants(request: Request, lat: float = Query(..., ge=-90, le=90), lng: float = Query(..., ge=-180, le=180),
+                                  radius: Optional[float] = Query(None, gt=0, le=MAX_NEARBY_RADIUS),
+                                  limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE), db: AsyncSession = Depends(get_async_db)):
+    """
+    Restaurants around a point, nearest first, with their distance in meters.
+    With `radius`, returns up to `limit` restaurants within it; without, returns the `limit`
+    nearest, widening the search from 500 m until enough are found (up to 50 km).
+    """
+    async def nearest() -> List[dict]:
+        if radius is not None:
+            return await query_nearby(db, lat, lng, radius, limit)
+        search_radius = NEARBY_START_RADIUS
+        while True:
+            restaurants = await query_nearby(db, lat, lng, search_radius, limit)
+            if len(restaurants) >= limit or search_radius >= MAX_NEARBY_RADIUS:
+                return restaurants
+            search_radius = min(search_radius * 4, MAX_NEARBY_RADIUS)
+
+    async def build() -> bytes:
+        return NearbyRestaurants.dump_json(NearbyRestaurants.validate_python(await nearest()))
+
+    return await cached_json(request, f"nearby:{lat}:{lng}:{radius}:{limit}", build)
 
-@router.get("/", response_model=List[RestaurantRead])
-def read_restaurants(db: Session = Depends(get_db)):
-    return db.query(Restaurant).all()
+SearchResults = TypeAdapter(List[RestaurantSearchResult])
+Suggestions = TypeAdapter(List[RestaurantSuggestion])
+
+@router.get("/search", response_model=List[RestaurantSearchResult])
+async def search_restaurants(request: Request, q: str = Query(..., min_length=1, max_length=200),
+                             limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE), db: AsyncSession = Depends(get_async_db)):
+    """
+    Full-text search over name, cuisine, description and address, best match first.
+    Matches in the name weigh most, then cuisine, description and address. `q` takes
+    web search syntax: "quoted phrases", `or`, and `-word` to exclude a word.
+    """
+    async def build() -> bytes:
+        query = func.websearch_to_tsquery("english", q)
+        rank = func.ts_rank_cd(Restaurant.search_vector, query).label("rank")
+        columns = [Restaurant.__table__.columns[name] for name in LIST_FIELDS]
+        statement = (
+            select(*columns, rank)
+            .where(Restaurant.search_vector.op("@@")(query))
+            .order_by(rank.desc(), Restaurant.id)
+            .limit(limit)
+        )
+        rows = (await db.execute(statement)).mappings()
+        return SearchResults.dump_json(SearchResults.validate_python([dict(row) for row in rows]))
+
+    return await cached_json(request, f"search:{limit}:{q}", build)
+
+_has_trigram_index: Optional[bool] = None
+
+async def has_trigram_index(db: AsyncSession) -> bool:
+    """Whether the pg_trgm index on restaurants.name exists (it needs the extension)"""
+    global _has_trigram_index
+    if _has_trigram_index is None:
+        _has_trigram_index = (await db.execute(text("SELECT to_regclass('ix_restaurants_name_trgm') IS NOT NULL"))).scalar()
+    return _has_trigram_index
+
+@router.get("/suggest", response_model=List[RestaurantSuggestion])
+async def suggest_restaurants(request: Request, q: str = Query(..., min_length=1, max_length=100),
+                              limit: int = Query(10, ge=1, le=50), db: AsyncSession = Depends(get_async_db)):
+    """
+    Typeahead on restaurant names. With pg_trgm, names are matched by trigram word
+    similarity, so partial and misspelled words still match; without it, by prefix.
+    """
+    prefix = q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+    async def build() -> bytes:
+        if await has_trigram_index(db):
+            score = func.word_similarity(q, Restaurant.name)
+            statement = (
+                select(Restaurant.id, Restaurant.name, Restaurant.city, score.label("score"))
+                .where(literal(q).op("<%")(Restaurant.name))
+                # Names starting with the query first, then the closest
+                .order_by(func.lower(Restaurant.name).like(prefix).desc(), score.desc(), Restaurant.name, Restaurant.id)
+                .limit(limit)
+            )
+        else:
+            statement = (
+                select(Restaurant.id, Restaurant.name, Restaurant.city)
+                .where(func.lower(Restaurant.name).like(prefix))
+                .order_by(func.lower(Restaurant.name), Restaurant.id)
+                .limit(limit)
+            )
+        rows = (await db.execute(statement)).mappings()
+        return Suggestions.dump_json(Suggestions.validate_python([dict(row) for row in rows]))
+
+    return await cached_json(request, f"suggest:{limit}:{q}", build)
+
+def hydrate_if_needed(restaurant_id: int, api_key: str):
+    # Hydration runs the crawler's sync code, so it gets a sync session on a worker thread
+    with Session(engine) as db:
+        restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+        if restaurant and restaurant.hydrated_at is None and restaurant.place_id:
+            hydrate_restaurant(db, restaurant, api_key)
+
+@router.get("/facets", response_model=RestaurantFacets)
+async def read_restaurant_facets(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Restaurant counts by city, cuisine_type, price_range, halal_status and rating (half-star
+    buckets, e.g. "4.5"), for filter UIs. Kept up to date on every write, so this never scans restaurants.
+    """
+    async def build() -> bytes:
+        counts = await db.run_sync(read_facet_counts)
+        facets = {
+            facet: dict(sorted(((value, count) for value, count in counts.get(facet, {}).items() if value is not None),
+                               key=lambda item: (-item[1], item[0])))
+            for facet in RESTAURANT_FACETS
+        }
+        return RestaurantFacets(total=facet_total(counts, "restaurants"), facets=facets).model_dump_json().encode("utf-8")
+
+    return await cached_json(request, "facets", build)
 
 @router.get("/{restaurant_id}", response_model=RestaurantRead)
-def read_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
-    return restaurant
+async def read_restaurant(request: Request, restaurant_id: int, hydrate: bool = False,
+                          include: Optional[str] = Query(None, pattern="^raw$"), db: AsyncSession = Depends(get_async_db)):
+    """One restaurant. The raw Google payload is left out unless `include=raw`; see also /{id}/raw"""
+    # Reviews and photos are not fetched during the crawl; hydrate=true fetches them now
+    api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+    if hydrate and api_key:
+        await run_in_threadpool(hydrate_if_needed, restaurant_id, api_key)
+
+    async def build() -> bytes:
+        query = select(Restaurant).where(Restaurant.id == restaurant_id)
+        schema = RestaurantRead
+        if include == "raw":
+            query = query.options(undefer(Restaurant.scraped_json))
+            schema = RestaurantReadRaw
+        restaurant = (await db.execute(query)).scalars().first()
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
+        return schema.model_validate(restaurant, from_attributes=True).model_dump_json().encode("utf-8")
+
+    return await cached_json(request, f"restaurant:{restaurant_id}:{include}", build)
+
+@router.get("/{restaurant_id}/raw", response_model=RestaurantRaw)
+async def read_restaurant_raw(request: Request, restaurant_id: int, db: AsyncSession = Depends(get_async_db)):
+    """The Place Details payload the restaurant was built from (with reviews and photos once hydrated)"""
+    async def build() -> bytes:
+        row = (await db.execute(
+            select(Restaurant.id, Restaurant.place_id, Restaurant.scraped_json).where(Restaurant.id == restaurant_id)
+        )).mappings().first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
+        return RestaurantRaw.model_validate(dict(row)).model_dump_json().encode("utf-8")
+
+    return await cached_json(request, f"raw:{restaurant_id}", build)
 
 @router.put("/{restaurant_id}", response_model=RestaurantRead)
-def update_restaurant(restaurant_id: int, restaurant: RestaurantUpdate, db: Session = Depends(get_db)):
-    db_restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+async def update_restaurant(restaurant_id: int, restaurant: RestaurantUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_restaurant = await db.get(Restaurant, restaurant_id)
     if not db_restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     for key, value in restaurant.dict(exclude_unset=True).items():
         setattr(db_restaurant, key, value)
-    db.commit()
-    db.refresh(db_restaurant)
+    await db.commit()
+    await db.refresh(db_restaurant)
     return db_restaurant
 
 @router.delete("/{restaurant_id}")
-def delete_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
-    db_restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+async def delete_restaurant(restaurant_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_restaurant = await db.get(Restaurant, restaurant_id)
     if not db_restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
-    db.delete(db_restaurant)
-    db.commit()
+    await db.delete(db_restaurant)
+    await db.commit()
     return {"detail": "Restaurant deleted"} 
\ No newline at end of file
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class CrawlJobSubmitted(BaseModel):
+    job_id: int
+    job_type: str
+    status: str
+
+class CrawlJobResponse(BaseModel):
+    id: int
+    job_type: str
+    status: str
+    params: Optional[Dict[str, Any]] = None
+    total_items: int = 0
+    processed_items: int = 0
+    error_items: int = 0
+    api_calls: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Derived from the counters above while the job runs
+    percent_complete: float = 0
+    items_per_second: float = 0
+    calls_per_second: float = 0
+    eta_seconds: Optional[float] = None
+
+    class Config:
+        from_attributes = True
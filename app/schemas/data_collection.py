@@ -13,6 +13,13 @@ class DataCollectionBase(BaseModel):
     retry_count: int = 0
     max_retries: int = 3
     response_body: Optional[Dict[str, Any]] = None
+    parent_id: Optional[int] = None
+    depth: int = 0
+    cell_size: Optional[float] = None
+    radius: Optional[int] = None
+    new_places_found: Optional[int] = 0
+    next_retry_at: Optional[datetime] = None
+    error_class: Optional[str] = None
 
 class DataCollectionCreate(DataCollectionBase):
     pass
@@ -28,6 +35,11 @@ class DataCollectionUpdate(BaseModel):
     retry_count: Optional[int] = None
     max_retries: Optional[int] = None
     response_body: Optional[Dict[str, Any]] = None
+    parent_id: Optional[int] = None
+    depth: Optional[int] = None
+    cell_size: Optional[float] = None
+    radius: Optional[int] = None
+    next_retry_at: Optional[datetime] = None
 
 class DataCollectionResponse(DataCollectionBase):
     id: int
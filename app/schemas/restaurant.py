@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Any
+from datetime import datetime
+from typing import Optional, Any, Dict, List
 
 class RestaurantBase(BaseModel):
     place_id: Optional[str] = None
@@ -18,17 +19,80 @@ class RestaurantBase(BaseModel):
     price_range: Optional[str] = None
     halal_status: Optional[str] = None
     rating: Optional[float] = None
-    scraped_json: Optional[Any] = None
+    user_ratings_total: Optional[int] = None
+    business_status: Optional[str] = None
+    types: Optional[List[str]] = None
     additional_info: Optional[str] = None
 
 class RestaurantCreate(RestaurantBase):
-    pass
+    scraped_json: Optional[Any] = None
 
 class RestaurantUpdate(RestaurantBase):
-    pass
+    scraped_json: Optional[Any] = None
 
 class RestaurantRead(RestaurantBase):
     id: int
+    hydrated_at: Optional[datetime] = None
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True 
+
+class RestaurantReadRaw(RestaurantRead):
+    """GET /restaurants/{id}?include=raw: the restaurant plus the Google payload"""
+    scraped_json: Optional[Any] = None
+
+class RestaurantRaw(BaseModel):
+    id: int
+    place_id: Optional[str] = None
+    scraped_json: Optional[Any] = None
+
+class RestaurantSummary(BaseModel):
+    """Every column but the raw Google payload"""
+    id: int
+    place_id: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    phone: Optional[str] = None
+    website: Optional[str] = None
+    opening_hours: Optional[str] = None
+    cuisine_type: Optional[str] = None
+    price_range: Optional[str] = None
+    halal_status: Optional[str] = None
+    rating: Optional[float] = None
+    user_ratings_total: Optional[int] = None
+    business_status: Optional[str] = None
+    types: Optional[List[str]] = None
+    additional_info: Optional[str] = None
+    hydrated_at: Optional[datetime] = None
+    geohash: Optional[str] = None
+
+class RestaurantListItem(RestaurantSummary):
+    """A row of GET /restaurants/; only the requested fields are set"""
+    scraped_json: Optional[Any] = None
+
+class RestaurantPage(BaseModel):
+    items: List[RestaurantListItem]
+    next_cursor: Optional[int] = None  # pass as `after` to get the next page; None on the last page
+
+class NearbyRestaurant(RestaurantSummary):
+    distance_m: float
+
+class RestaurantSearchResult(RestaurantSummary):
+    rank: float
+
+class RestaurantSuggestion(BaseModel):
+    id: int
+    name: str
+    city: Optional[str] = None
+    score: Optional[float] = None  # trigram word similarity to the query; None for plain prefix matches
+
+class RestaurantFacets(BaseModel):
+    total: int
+    # facet -> value -> restaurants with it, most common first; restaurants without a value aren't listed
+    facets: Dict[str, Dict[str, int]]
@@ -0,0 +1,50 @@
+import os
+from pathlib import Path
+
+# The tests run against their own database on the configured server, created and
+# migrated for the run and dropped afterwards. Set before the app builds its engines.
+os.environ["POSTGRES_DB"] = os.getenv("TEST_POSTGRES_DB", "halal_site_test")
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import connection
+
+ROOT = Path(__file__).resolve().parent.parent
+TABLES = ["restaurants", "discovered_places", "data_collection_api_calls", "facet_counts", "crawl_jobs"]
+
+@pytest.fixture(scope="session")
+def database():
+    """The migrated test database; skips the tests that need it when Postgres is not reachable"""
+    server_url = connection.DATABASE_URL.rsplit("/", 1)[0] + "/postgres"
+    server = create_engine(server_url, isolation_level="AUTOCOMMIT")
+    try:
+        with server.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{connection.DB_NAME}"'))
+            conn.execute(text(f'CREATE DATABASE "{connection.DB_NAME}"'))
+    except OperationalError as e:
+        server.dispose()
+        pytest.skip(f"Postgres is not available: {e.orig}")
+
+    command.upgrade(Config(str(ROOT / "alembic.ini")), "head")
+    connection.engine.echo = False
+    connection.async_engine.echo = False
+    yield connection.engine
+
+    connection.engine.dispose()
+    with server.connect() as conn:
+        conn.execute(text(f'DROP DATABASE "{connection.DB_NAME}"'))
+    server.dispose()
+
+@pytest.fixture
+def db(database):
+    """A session on the test database, emptied after each test"""
+    with Session(database) as session:
+        yield session
+        session.rollback()
+        session.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+        session.commit()
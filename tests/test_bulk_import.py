@@ -0,0 +1,31 @@
+import asyncio
+import json
+
+from app.database.bulk_import import import_restaurants
+from app.database.upsert import RestaurantWriter
+from app.models.restaurant import Restaurant
+
+def run_import(lines):
+    async def body():
+        yield "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+
+    async def collect():
+        return [json.loads(line) async for line in import_restaurants(body(), "ndjson")]
+
+    return asyncio.run(collect())
+
+def test_import_updates_existing_restaurants_including_halal_status(db):
+    writer = RestaurantWriter(db, insert_only=())
+    writer.add({"place_id": "p1", "name": "Old name", "city": "Toronto", "halal_status": "certified"})
+    writer.add({"place_id": "p2", "name": "Kept", "halal_status": "certified"})
+    writer.flush()
+
+    output = run_import([
+        {"place_id": "p1", "name": "New name", "halal_status": "not halal"},
+        {"place_id": "p2", "name": "Kept", "city": "Mississauga"},
+    ])
+
+    assert output == [{"summary": True, "rows": 2, "saved": 2, "errors": 0}]
+    restaurants = {restaurant.place_id: restaurant for restaurant in db.query(Restaurant)}
+    assert (restaurants["p1"].name, restaurants["p1"].city, restaurants["p1"].halal_status) == ("New name", "Toronto", "not halal")
+    assert (restaurants["p2"].city, restaurants["p2"].halal_status) == ("Mississauga", "certified")
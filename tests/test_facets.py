@@ -0,0 +1,65 @@
+from sqlalchemy import text
+
+from app.crawler.grid import coarse_cells, insert_cells
+from app.database import facets
+from app.database.facets import RESTAURANT_FACETS, read_facet_counts
+from app.database.upsert import RestaurantWriter
+from app.models.restaurant import Restaurant
+
+RATING_BUCKET = "(floor(rating * 2) / 2)::numeric(2, 1)::text"
+
+def expected_counts(db):
+    """The facet counts computed from scratch with GROUP BY"""
+    counts = {"restaurants": {None: db.query(Restaurant).count()}}
+    for facet in RESTAURANT_FACETS:
+        column = RATING_BUCKET if facet == "rating" else facet
+        rows = db.execute(text(f"SELECT {column}, count(*) FROM restaurants GROUP BY 1"))
+        counts[facet] = {value: count for value, count in rows}
+    counts["cells"] = dict(db.execute(text("SELECT status, count(*) FROM data_collection_api_calls GROUP BY 1")).all())
+    for facet in ("api_calls_made", "restaurants_found"):
+        counts[facet] = {None: db.execute(text(f"SELECT coalesce(sum({facet}), 0) FROM data_collection_api_calls")).scalar()}
+    return {facet: values for facet, values in counts.items() if any(values.values())}
+
+def add_restaurants(db, count):
+    writer = RestaurantWriter(db)
+    for n in range(count):
+        writer.add({
+            "place_id": f"place-{n}",
+            "name": f"Restaurant {n}",
+            "city": ["Toronto", "Mississauga", None][n % 3],
+            "cuisine_type": ["Turkish", "Pakistani"][n % 2],
+            "halal_status": "certified" if n % 4 == 0 else None,
+            "rating": None if n % 5 == 0 else 3 + (n % 7) / 3,
+        })
+    writer.flush()
+
+def test_counts_match_group_by_after_inserts_updates_and_deletes(db):
+    add_restaurants(db, 40)
+    insert_cells(db, coarse_cells(0.05))
+    db.commit()
+    assert read_facet_counts(db) == expected_counts(db)
+
+    db.execute(text("UPDATE restaurants SET city = 'Brampton', rating = 4.9 WHERE id % 3 = 0"))
+    db.execute(text("UPDATE data_collection_api_calls SET status = 'completed', api_calls_made = 2, restaurants_found = id WHERE id <= 5"))
+    add_restaurants(db, 50)  # 40 upserts of existing place_ids, 10 new ones
+    db.commit()
+    assert read_facet_counts(db) == expected_counts(db)
+
+    db.execute(text("DELETE FROM restaurants WHERE id % 4 = 1"))
+    db.execute(text("DELETE FROM data_collection_api_calls WHERE id = 2"))
+    db.commit()
+    assert read_facet_counts(db) == expected_counts(db)
+
+def test_reads_compact_the_deltas(db, monkeypatch):
+    monkeypatch.setattr(facets, "FACET_COMPACT_ROWS", 5)
+    add_restaurants(db, 20)
+    for n in range(5):
+        db.execute(text("UPDATE restaurants SET city = :city WHERE id % 2 = 0"), {"city": f"City {n}"})
+    db.commit()
+    before = db.execute(text("SELECT count(*) FROM facet_counts")).scalar()
+
+    assert read_facet_counts(db) == expected_counts(db)
+    rows = db.execute(text("SELECT count(*) FROM facet_counts")).scalar()
+    distinct = db.execute(text("SELECT count(DISTINCT (facet, value)) FROM facet_counts")).scalar()
+    assert rows == distinct < before
+    assert read_facet_counts(db) == expected_counts(db)
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import Session
+
+from app.crawler import jobs
+from app.crawler.jobs import claim_next_job, run_job
+from app.models.crawl_job import CrawlJob
+
+def queue_jobs(db, count, job_type="test_job"):
+    queued = [CrawlJob(job_type=job_type, status="queued", params={}) for _ in range(count)]
+    db.add_all(queued)
+    db.commit()
+    return [job.id for job in queued]
+
+def test_claim_next_job_marks_the_oldest_job_running(db):
+    first, second = queue_jobs(db, 2)
+    assert claim_next_job(db) == first
+    assert claim_next_job(db) == second
+    assert claim_next_job(db) is None
+    assert {job.status for job in db.query(CrawlJob)} == {"running"}
+
+def test_concurrent_workers_claim_each_job_once(db):
+    job_ids = queue_jobs(db, 20)
+
+    def claim_all(_):
+        claimed = []
+        with Session(db.get_bind()) as session:
+            while (job_id := claim_next_job(session)) is not None:
+                claimed.append(job_id)
+        return claimed
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        claimed = [job_id for batch in pool.map(claim_all, range(4)) for job_id in batch]
+    assert sorted(claimed) == job_ids
+
+def test_run_job_runs_a_claimed_job(db, monkeypatch):
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "test_job", lambda session, params, progress: {"ok": True})
+    (job_id,) = queue_jobs(db, 1)
+    run_job(claim_next_job(db), claimed=True)
+
+    job = db.get(CrawlJob, job_id)
+    db.refresh(job)
+    assert (job.status, job.result) == ("completed", {"ok": True})
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.crawler.grid import coarse_cells, insert_cells
+from app.crawler.leases import claim_cells, claimed_cells, release_lease
+
+def add_cells(db, step=0.05):
+    insert_cells(db, coarse_cells(step))
+    db.commit()
+    return db.execute(text("SELECT count(*) FROM data_collection_api_calls")).scalar()
+
+def test_two_claimers_get_disjoint_cells(db):
+    add_cells(db)
+    first = {cell.id for cell in claim_cells(db, "worker-a", "pending", 5)}
+    second = {cell.id for cell in claim_cells(db, "worker-b", "pending", 5)}
+
+    assert len(first) == len(second) == 5
+    assert first.isdisjoint(second)
+
+def test_concurrent_workers_claim_every_cell_once(db):
+    total = add_cells(db, step=0.02)
+
+    def drain(worker_id):
+        with Session(db.get_bind()) as session:
+            return [cell.id for cell in claimed_cells(session, worker_id, "pending", batch_size=3)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        claimed = list(pool.map(drain, [f"worker-{n}" for n in range(4)]))
+
+    ids = [cell_id for batch in claimed for cell_id in batch]
+    assert len(ids) == total
+    assert len(set(ids)) == total
+
+def test_expired_lease_can_be_reclaimed_but_not_released_by_its_old_owner(db):
+    add_cells(db)
+    (cell,) = claim_cells(db, "worker-a", "pending", 1, lease_seconds=-1)
+    (reclaimed,) = claim_cells(db, "worker-b", "pending", 1)
+    assert reclaimed.id == cell.id
+
+    assert not release_lease(db, cell, "worker-a")
+    assert release_lease(db, cell, "worker-b")
+    db.commit()
+    assert db.execute(text("SELECT lease_owner FROM data_collection_api_calls WHERE id = :id"), {"id": cell.id}).scalar() is None
@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+
+from app.crawler.cache import ResponseCache
+from app.crawler.places import NEARBY_QUERY, QUERY_LABELS, RESULT_CAP, PlacesClient, get_all_restaurants_for_location
+from app.crawler.query_planner import QueryPlanner
+from app.crawler.rate_limiter import TokenBucket
+
+class StubPlacesClient:
+    """Three full pages per text query; the first page holds only places an earlier cell found"""
+
+    async def cached(self, key):
+        return None
+
+    async def store(self, key, data):
+        pass
+
+    async def text_search(self, query, lat, lng, page_token=None, radius=None, run=None):
+        page = int(page_token or 0)
+        run.calls += 1
+        results = [{"place_id": f"{query}-{page}-{n}"} for n in range(RESULT_CAP // 3)]
+        return {"status": "OK", "results": results, **({"next_page_token": str(page + 1)} if page < 2 else {})}
+
+    async def nearby_search(self, lat, lng, radius=None, run=None):
+        return {"status": "ZERO_RESULTS", "results": []}
+
+def crawl(depth, enabled=True):
+    known = {f"{label} near 43.5,-79.7-0-{n}" for label in QUERY_LABELS for n in range(RESULT_CAP // 3)}
+    planner = QueryPlanner(QUERY_LABELS, enabled=enabled)
+    return asyncio.run(get_all_restaurants_for_location(StubPlacesClient(), 43.5, -79.7, 1500, known, planner, depth=depth))
+
+def text_query_calls(results):
+    return {label: stats["calls"] for label, stats in results.query_stats.items() if label != NEARBY_QUERY}
+
+def test_coarse_cell_queries_stop_paging_when_nothing_is_new():
+    results = crawl(depth=0)
+    assert set(text_query_calls(results).values()) == {1}
+    assert not results.saturated
+
+def test_split_cells_page_to_the_end_and_can_be_saturated():
+    results = crawl(depth=1)
+    assert set(text_query_calls(results).values()) == {3}
+    assert results.saturated
+
+def test_no_early_stop_without_pruning():
+    assert crawl(depth=0, enabled=False).saturated
+
+def test_details_are_served_from_the_response_cache(tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"status": "OK", "result": {"name": "Kebab House"}})
+
+    async def fetch_twice():
+        cache = ResponseCache(str(tmp_path / "places.sqlite3"), ttl_seconds=60, max_bytes=1 << 20)
+        async with httpx.AsyncClient(base_url="http://places.test", transport=httpx.MockTransport(handler)) as http:
+            client = PlacesClient(http, "test-key", limiter=TokenBucket(1000), cache=cache)
+            return [await client.details("p1", "name") for _ in range(2)]
+
+    first, second = asyncio.run(fetch_twice())
+    assert first == second == {"status": "OK", "result": {"name": "Kebab House"}}
+    assert len(requests) == 1
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+from app.crawler import engine, tasks
+from app.crawler.grid import coarse_cells, insert_cells
+from app.crawler.jobs import JobProgress
+from app.crawler.places import LocationResults
+from app.models.crawl_job import CrawlJob
+
+def test_children_of_a_saturated_cell_are_crawled_in_the_same_job(db, monkeypatch):
+    cell = coarse_cells()[0]
+    insert_cells(db, [cell])
+    job = CrawlJob(job_type="process_locations", status="running")
+    db.add(job)
+    db.commit()
+
+    async def search(client, lat, lng, radius, known_place_ids, depth):
+        # Only the coarse cell hits the result cap, so it splits once
+        place_id = f"place-{lat}-{lng}"
+        return LocationResults(results=[{"place_id": place_id}], saturated=radius >= cell["radius"],
+                               found_by={place_id: "restaurant"})
+
+    monkeypatch.setenv("GOOGLE_MAPS_API_KEY", "test-key")
+    monkeypatch.setattr(engine, "get_all_restaurants_for_location", search)
+    result = tasks.process_locations_job(db, {"concurrency": 2}, JobProgress(db, job))
+
+    statuses = dict(db.execute(text("SELECT depth, array_agg(DISTINCT status) FROM data_collection_api_calls GROUP BY depth")).all())
+    assert statuses == {0: ["completed"], 1: ["completed"]}
+    assert result["processed_successfully"] == 5
+    assert result["cells_split"] == 1
@@ -0,0 +1,52 @@
+from app.database.upsert import RestaurantWriter
+from app.models.restaurant import Restaurant
+
+def place(place_id, **fields):
+    return {"place_id": place_id, "name": f"Restaurant {place_id}", "latitude": 43.65, "longitude": -79.38, **fields}
+
+def test_flush_keeps_the_last_row_of_a_duplicated_place_id(db):
+    writer = RestaurantWriter(db)
+    for row in [place("a", city="Toronto"), place("b"), place("a", city="Mississauga")]:
+        writer.add(row, context=row)
+    results = writer.flush()
+
+    assert [result.context["place_id"] for result in results] == ["a", "b", "a"]
+    assert results[0].id is None and "superseded" in results[0].error
+    assert results[1].error is None and results[2].error is None
+    assert db.query(Restaurant).count() == 2
+    assert db.get(Restaurant, results[2].id).city == "Mississauga"
+    assert (writer.written, writer.failed) == (2, 1)
+
+def test_flush_reports_invalid_rows_on_their_own(db):
+    writer = RestaurantWriter(db)
+    rows = [place("a"), place("b", name=None), place("c"), {"name": "No place_id"}]
+    for row in rows:
+        writer.add(row)
+    results = writer.flush()
+
+    assert [result.error is None for result in results] == [True, False, True, True]
+    assert "null value" in results[1].error
+    assert sorted(name for (name,) in db.query(Restaurant.name)) == ["No place_id", "Restaurant a", "Restaurant c"]
+    assert (writer.written, writer.failed) == (3, 1)
+
+def test_update_keeps_stored_values_the_row_does_not_carry(db):
+    writer = RestaurantWriter(db)
+    writer.add(place("a", city="Toronto", halal_status="certified", scraped_json={"name": "A", "reviews": [1]}))
+    writer.flush()
+    writer.add(place("a", city=None, halal_status=None, scraped_json={"name": "A2"}))
+    (result,) = writer.flush()
+
+    restaurant = db.get(Restaurant, result.id)
+    db.refresh(restaurant)
+    assert restaurant.city == "Toronto"
+    assert restaurant.halal_status == "certified"
+    assert restaurant.scraped_json == {"name": "A2", "reviews": [1]}
+
+def test_insert_only_columns_are_set_on_insert_only(db):
+    writer = RestaurantWriter(db, insert_only={"halal_status"})
+    writer.add(place("a", halal_status="certified"))
+    writer.flush()
+    writer.add(place("a", halal_status="unknown"))
+    writer.add(place("b", halal_status="unknown"))
+    writer.flush()
+    assert dict(db.query(Restaurant.place_id, Restaurant.halal_status)) == {"a": "certified", "b": "unknown"}